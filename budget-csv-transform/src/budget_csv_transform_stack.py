@@ -6,17 +6,19 @@ from aws_cdk import (
     aws_rds as rds,
     aws_ec2 as ec2,
     aws_secretsmanager as secretsmanager,
+    aws_sqs as sqs,
+    aws_s3_notifications as s3n,
     Duration,
     RemovalPolicy
 )
-from aws_cdk.aws_lambda_event_sources import S3EventSource
+from aws_cdk.aws_lambda_event_sources import SqsEventSource
 from aws_cdk.aws_s3 import NotificationKeyFilter, EventType
 from constructs import Construct
 
 
 class BudgetCsvTransformStack(Stack):
 
-    def __init__(self, scope: Construct, construct_id: str, stage="dev", **kwargs):
+    def __init__(self, scope: Construct, construct_id: str, stage="dev", archive_layer_arn=None, zstd_layer_arn=None, **kwargs):
         super().__init__(scope, construct_id, **kwargs)
 
         # 🔐 Secret in AWS Secrets Manager that stores RDS credentials
@@ -144,11 +146,56 @@ class BudgetCsvTransformStack(Stack):
             resources=[f"arn:aws:s3:::{bucket_name}/*"]
         ))
 
-        # 📦 S3 trigger — Lambda is triggered when a new CSV file is uploaded to the bucket
+        # 🗄️ Optional Parquet archive of loaded transactions (archive/year=YYYY/month=M/) — enabled by
+        # passing the ARN of a layer that provides pyarrow, e.g. AWS SDK for pandas
+        if archive_layer_arn:
+            lambda_fn.add_layers(
+                _lambda.LayerVersion.from_layer_version_arn(self, "PyarrowLayer", archive_layer_arn)
+            )
+            lambda_fn.add_environment("PARQUET_ARCHIVE", f"s3://{bucket_name}/archive")
+            bucket.grant_put(lambda_fn, "archive/*")
+
+        # 📬 SQS buffer between S3 and Lambda — bursts of uploads wait in the queue instead of
+        # fanning out into parallel invocations that exhaust the t3.micro connection limit
+        dead_letter_queue = sqs.Queue(
+            self, f"CsvIngestDlq-{stage}",
+            queue_name=f"csv-ingest-dlq-{stage}",
+            retention_period=Duration.days(14)
+        )
+
+        ingest_queue = sqs.Queue(
+            self, f"CsvIngestQueue-{stage}",
+            queue_name=f"csv-ingest-{stage}",
+            # AWS recommends at least 6x the function timeout for SQS event sources
+            visibility_timeout=Duration.minutes(30),
+            dead_letter_queue=sqs.DeadLetterQueue(max_receive_count=3, queue=dead_letter_queue)
+        )
+
+        # 🗜️ zstd-compressed uploads need the zstandard package, which no default layer provides —
+        # .csv.zst files are only queued when a layer with zstandard is passed (see psycopg2-layer/README.md)
+        suffixes = [".csv", ".csv.gz"]
+        if zstd_layer_arn:
+            lambda_fn.add_layers(
+                _lambda.LayerVersion.from_layer_version_arn(self, "ZstandardLayer", zstd_layer_arn)
+            )
+            suffixes.append(".csv.zst")
+
+        # 📦 S3 notification — every new CSV file (plain or compressed) is queued
+        # A notification filter accepts a single suffix, so each format gets its own notification
+        for suffix in suffixes:
+            bucket.add_event_notification(
+                EventType.OBJECT_CREATED,
+                s3n.SqsDestination(ingest_queue),
+                NotificationKeyFilter(suffix=suffix)
+            )
+
+        # 🧮 Lambda consumes the queue in batches with capped concurrency (one DB connection per invocation)
         lambda_fn.add_event_source(
-            S3EventSource(
-                bucket,
-                events=[EventType.OBJECT_CREATED],
-                filters=[NotificationKeyFilter(suffix=".csv")]
+            SqsEventSource(
+                ingest_queue,
+                batch_size=10,
+                max_batching_window=Duration.seconds(30),
+                max_concurrency=2,
+                report_batch_item_failures=True
             )
         )
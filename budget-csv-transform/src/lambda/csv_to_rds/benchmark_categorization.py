@@ -0,0 +1,43 @@
+# benchmark_categorization.py
+#
+# Per-row latency of the ingest-time categorization (categorization.py) against the
+# uncompiled keyword loop of auto_categorize.py, on a local export.
+#
+#   python benchmark_categorization.py                # test.csv
+#   python benchmark_categorization.py export.csv 50
+
+import csv
+import sys
+import time
+
+from categorization import CATEGORIES, categorize
+
+def categorize_naive(description, sender_receiver, product):
+    # Uncompiled keyword loop of auto_categorize.py, kept as the latency baseline
+    combined_text = f"{description or ''} {sender_receiver or ''} {product or ''}".lower()
+    for category, keywords in CATEGORIES.items():
+        for keyword in keywords:
+            if keyword.lower() in combined_text:
+                return category, keyword
+    return None, None
+
+def benchmark(csv_file="test.csv", repeat=20):
+    """Print per-row categorization latency on a local export."""
+    with open(csv_file, encoding="utf-8", newline="") as f:
+        reader = csv.reader(f, delimiter=";")
+        next(reader)
+        rows = [(row[6], row[5], row[7]) for row in reader]
+
+    for name, fn in [("naive", categorize_naive), ("prepared", categorize)]:
+        start = time.perf_counter()
+        for _ in range(repeat):
+            for row in rows:
+                fn(*row)
+        per_row = (time.perf_counter() - start) / (repeat * len(rows))
+        print(f"⏱️ {name:9}: {per_row * 1_000_000:.1f} µs/row")
+
+    categorized = sum(1 for row in rows if categorize(*row)[0])
+    print(f"📊 Categorized {categorized} of {len(rows)} rows")
+
+if __name__ == "__main__":
+    benchmark(*sys.argv[1:2], *(int(arg) for arg in sys.argv[2:3]))
@@ -0,0 +1,82 @@
+# benchmark_queries.py
+#
+# Compares typical budget queries on the partitioned transactions table and on
+# the transactions_legacy heap kept by migrate_partitioning.sql.
+#
+#   python benchmark_queries.py --month 2025-03 --merchant biedronka
+
+import argparse
+import json
+import os
+
+import psycopg2
+
+db_config = {
+    "host": os.environ.get("DB_HOST", "localhost"),
+    "port": os.environ.get("DB_PORT", "5432"),
+    "dbname": os.environ.get("DB_NAME", "budget"),
+    "user": os.environ.get("DB_USER", "budgetadmin"),
+    "password": os.environ.get("DB_PASSWORD", ""),
+}
+
+QUERIES = {
+    "monthly spend": """
+        SELECT currency, SUM(amount), COUNT(*)
+        FROM {table}
+        WHERE transaction_date >= %(month_start)s AND transaction_date < %(month_end)s
+        GROUP BY currency
+    """,
+    "merchant history": """
+        SELECT transaction_date, amount, description
+        FROM {table}
+        WHERE description ILIKE %(pattern)s OR sender_receiver ILIKE %(pattern)s
+        ORDER BY transaction_date
+    """,
+    "merchant in month": """
+        SELECT SUM(amount), COUNT(*)
+        FROM {table}
+        WHERE transaction_date >= %(month_start)s AND transaction_date < %(month_end)s
+          AND description ILIKE %(pattern)s
+    """,
+}
+
+def execution_time(cursor, sql, params):
+    cursor.execute("EXPLAIN (ANALYZE, BUFFERS, FORMAT JSON) " + sql, params)
+    plan = cursor.fetchone()[0]
+    if isinstance(plan, str):
+        plan = json.loads(plan)
+    root = plan[0]
+    buffers = root["Plan"].get("Shared Hit Blocks", 0) + root["Plan"].get("Shared Read Blocks", 0)
+    return root["Execution Time"], buffers
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark budget queries: partitioned vs legacy table")
+    parser.add_argument("--month", required=True, help="Month to query, e.g. 2025-03")
+    parser.add_argument("--merchant", required=True, help="Merchant text to search for, e.g. biedronka")
+    parser.add_argument("--repeat", type=int, default=5, help="Runs per query, the best one is reported")
+    args = parser.parse_args()
+
+    year, month = (int(part) for part in args.month.split("-"))
+    params = {
+        "month_start": f"{year:04d}-{month:02d}-01",
+        "month_end": f"{year + month // 12:04d}-{month % 12 + 1:02d}-01",
+        "pattern": f"%{args.merchant}%",
+    }
+
+    conn = psycopg2.connect(**db_config)
+    cursor = conn.cursor()
+
+    print(f"{'query':20} {'legacy ms':>10} {'partitioned ms':>15} {'speedup':>8} {'buffers':>16}")
+    for name, sql in QUERIES.items():
+        results = {}
+        for table in ("transactions_legacy", "transactions"):
+            runs = [execution_time(cursor, sql.format(table=table), params) for _ in range(args.repeat)]
+            results[table] = min(runs)
+        (legacy_ms, legacy_buffers), (new_ms, new_buffers) = results["transactions_legacy"], results["transactions"]
+        print(f"{name:20} {legacy_ms:10.2f} {new_ms:15.2f} {legacy_ms / new_ms:7.1f}x {legacy_buffers:>7} → {new_buffers:<7}")
+
+    cursor.close()
+    conn.close()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,41 @@
+# categorization.py
+#
+# Keyword rules applied at ingest time. The rules live in categories.json, shipped with the
+# Lambda, and load_categories below is their only loader: the tools in transactions_ml_model
+# import this module through transactions_reader.CATEGORIZATION_MODULE, the one place outside
+# the Lambda that knows its path. The first matching category wins, in file order.
+#
+# Rules are matched against description, sender_receiver and product. sender_receiver is the
+# bank export's "Nadawca / odbiorca" column; auto_categorize.py matches the same text
+# (Opis, Nadawca / odbiorca or Nadawca + Odbiorca, Produkt).
+
+import json
+import os
+
+CATEGORIES_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "categories.json")
+
+def load_categories(path=CATEGORIES_FILE):
+    with open(path, encoding="utf-8") as f:
+        return json.load(f)
+
+CATEGORIES = load_categories()
+
+def compile_rules(categories):
+    # Keywords are lowercased once; per row only the text is lowercased and searched with `in`,
+    # which benchmarks faster than one regex alternation per category
+    return [
+        (category, tuple((keyword.lower(), keyword) for keyword in keywords))
+        for category, keywords in categories.items()
+    ]
+
+# Compiled once per container
+COMPILED_RULES = compile_rules(CATEGORIES)
+
+def categorize(description, sender_receiver, product):
+    """Return (category, keyword) of the first matching rule, or (None, None)."""
+    combined_text = f"{description or ''} {sender_receiver or ''} {product or ''}".lower()
+    for category, keywords in COMPILED_RULES:
+        for lowered, keyword in keywords:
+            if lowered in combined_text:
+                return category, keyword
+    return None, None
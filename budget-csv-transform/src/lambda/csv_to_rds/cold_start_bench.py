@@ -0,0 +1,121 @@
+# cold_start_bench.py
+#
+# Measures cold and warm start times of handler.main locally. Every cold run is a fresh
+# Python process that imports the handler as the Lambda runtime would, with the
+# AWS_LAMBDA_FUNCTION_NAME variable set so eager initialization kicks in. AWS clients are
+# real boto3 clients (their creation is what we measure), but their calls and Postgres are
+# served by the stand-ins from replay_events.py.
+#
+#   python cold_start_bench.py                       # current handler
+#   python cold_start_bench.py --baseline HEAD~1     # also a handler.py from another git revision
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+LAMBDA_FILES = ["handler.py", "categorization.py", "categories.json", "parquet_archive.py"]
+
+CHILD = r"""
+import contextlib, io, json, statistics, sys, time
+handler_dir, tools_dir, csv_file, warm_runs = sys.argv[1], sys.argv[2], sys.argv[3], int(sys.argv[4])
+sys.path[:0] = [handler_dir, tools_dir]
+
+start = time.perf_counter()
+with contextlib.redirect_stdout(io.StringIO()):
+    import handler
+import_ms = (time.perf_counter() - start) * 1000
+
+import boto3
+import replay_events
+
+with open(csv_file, "rb") as f:
+    payload = f.read()
+fakes = replay_events.FakeBoto3(replay_events.FakeS3(payload, 0)).clients
+
+class ClientFactory:
+    # Creates the real client (that cost is part of the cold start) but returns a stand-in
+    def client(self, name, **kwargs):
+        boto3.client(name, **kwargs)
+        return fakes[name]
+
+handler.boto3 = ClientFactory()
+for name in getattr(handler, "clients", {}):
+    handler.clients[name] = fakes[name]
+handler.psycopg2 = replay_events.FakePostgres(1000, 0, 0)
+
+event = replay_events.build_events(1, "direct", 1)[0]
+invocations = []
+with contextlib.redirect_stdout(io.StringIO()):
+    for _ in range(1 + warm_runs):
+        start = time.perf_counter()
+        handler.main(event, None)
+        invocations.append((time.perf_counter() - start) * 1000)
+
+print(json.dumps({
+    "import_ms": import_ms,
+    "first_invocation_ms": invocations[0],
+    "warm_invocation_ms": statistics.median(invocations[1:]) if warm_runs else None,
+    "init_timings": getattr(handler, "INIT_TIMINGS", {}),
+}))
+"""
+
+def export_revision(revision, target_dir):
+    # Writes the Lambda sources of a git revision to target_dir
+    for file_name in LAMBDA_FILES:
+        result = subprocess.run(
+            ["git", "show", f"{revision}:./{file_name}"],
+            cwd=HERE, capture_output=True, text=True, encoding="utf-8"
+        )
+        if result.returncode == 0:
+            with open(os.path.join(target_dir, file_name), "w", encoding="utf-8") as f:
+                f.write(result.stdout)
+
+def measure(handler_dir, runs, warm_runs, csv_file):
+    env = dict(os.environ, AWS_LAMBDA_FUNCTION_NAME="cold-start-bench", AWS_DEFAULT_REGION="eu-central-1",
+               AWS_ACCESS_KEY_ID="bench", AWS_SECRET_ACCESS_KEY="bench",
+               BUCKET_NAME="bench", SECRET_ARN="bench", DB_NAME="postgres",
+               RDS_ENDPOINT="localhost", RDS_PORT="5432")
+    results = []
+    for _ in range(runs):
+        output = subprocess.run(
+            [sys.executable, "-c", CHILD, handler_dir, HERE, csv_file, str(warm_runs)],
+            env=env, capture_output=True, text=True, check=True
+        ).stdout
+        results.append(json.loads(output.strip().splitlines()[-1]))
+    return results
+
+def summarize(label, results):
+    def median(key):
+        return statistics.median(result[key] for result in results)
+
+    import_ms, first_ms, warm_ms = median("import_ms"), median("first_invocation_ms"), median("warm_invocation_ms")
+    print(f"\n📊 {label}: cold start {import_ms + first_ms:.1f} ms "
+          f"(init {import_ms:.1f} ms + first invocation {first_ms:.1f} ms), warm invocation {warm_ms:.1f} ms")
+
+    phases = sorted({name for result in results for name in result["init_timings"]})
+    for name in phases:
+        values = [result["init_timings"][name] for result in results if name in result["init_timings"]]
+        print(f"  {name:24} {statistics.median(values):8.1f} ms")
+
+def main():
+    parser = argparse.ArgumentParser(description="Local cold/warm start benchmark of handler.main")
+    parser.add_argument("--runs", type=int, default=10, help="Cold starts (fresh processes) per handler")
+    parser.add_argument("--warm", type=int, default=10, help="Warm invocations after each cold start")
+    parser.add_argument("--baseline", default=None, help="Git revision to compare with, e.g. HEAD~1")
+    parser.add_argument("--csv", default=os.path.join(HERE, "test.csv"), help="File served for the S3 object")
+    args = parser.parse_args()
+
+    summarize("current", measure(HERE, args.runs, args.warm, args.csv))
+
+    if args.baseline:
+        with tempfile.TemporaryDirectory() as baseline_dir:
+            export_revision(args.baseline, baseline_dir)
+            summarize(f"baseline {args.baseline}", measure(baseline_dir, args.runs, args.warm, args.csv))
+
+if __name__ == "__main__":
+    main()
@@ -1,13 +1,51 @@
 # handler.py
 
-import boto3
-import csv
-import os
-import psycopg2
-import json
-from io import StringIO
-from datetime import datetime
-from decimal import Decimal
+import time
+from contextlib import contextmanager
+
+# Init-phase breakdown (ms) — emitted as one log line at the end of the first invocation
+INIT_TIMINGS = {}
+init_started = time.perf_counter()
+
+@contextmanager
+def init_timer(name):
+    start = time.perf_counter()
+    yield
+    INIT_TIMINGS[name] = round((time.perf_counter() - start) * 1000, 2)
+
+with init_timer("import boto3"):
+    import boto3
+with init_timer("import psycopg2"):
+    import psycopg2
+with init_timer("import stdlib"):
+    import csv
+    import io
+    import json
+    import os
+    from datetime import datetime
+    from decimal import Decimal
+    from urllib.parse import unquote_plus
+with init_timer("import local modules"):
+    from categorization import categorize
+    from parquet_archive import ParquetArchiveWriter
+
+# AWS clients are created once per container
+clients = {}
+
+def get_client(name):
+    if name not in clients:
+        with init_timer(f"client {name}"):
+            clients[name] = boto3.client(name)
+    return clients[name]
+
+# Client creation is pure CPU work, so it is done eagerly in the init phase inside Lambda.
+# Elsewhere (local_test.py, replay tools) clients are created on first use.
+if "AWS_LAMBDA_FUNCTION_NAME" in os.environ:
+    get_client("s3")
+    get_client("secretsmanager")
+
+INIT_TIMINGS["init total"] = round((time.perf_counter() - init_started) * 1000, 2)
+cold_start = True
 
 def parse_field(value):
     return value.strip() if value.strip() != "" else None
@@ -50,83 +88,295 @@ def parse_row(row):
         to_decimal(row[12])
     ]
 
-def process_csv_file(csv_content, db_config):
+# Monthly partitions of the transactions table known to exist — kept for the lifetime of the container
+known_partitions = set()
+
+def ensure_partitions(conn, months):
+    # Runs in its own short transaction before the file is loaded: CREATE TABLE ... PARTITION OF
+    # takes an ACCESS EXCLUSIVE lock on transactions, which must not be held while rows are inserted
+    missing = sorted(set(months) - known_partitions)
+    if not missing:
+        return
+    cursor = conn.cursor()
+    try:
+        for month in missing:
+            cursor.execute("SELECT ensure_transactions_partition(%s)", (month,))
+            print(f"🗂️ Partition ready: {cursor.fetchone()[0]}")
+        conn.commit()
+    finally:
+        cursor.close()
+    known_partitions.update(missing)
+
+def add_to_monthly_spend(deltas, parsed_row, category=None):
+    # Keyed like monthly_category_spend: (month, category, currency) → [total, spend, income, count]
+    amount = parsed_row[3] or Decimal(0)
+    key = (parsed_row[0].replace(day=1), category or "UNCATEGORIZED", parsed_row[4] or "UNKNOWN")
+    totals = deltas.setdefault(key, [Decimal(0), Decimal(0), Decimal(0), 0])
+    totals[0] += amount
+    if amount < 0:
+        totals[1] -= amount
+    else:
+        totals[2] += amount
+    totals[3] += 1
+
+def update_monthly_spend(cursor, deltas):
+    upsert_sql = """
+        INSERT INTO monthly_category_spend (
+            month, category, currency, total_amount, spend, income, transaction_count
+        ) VALUES (%s, %s, %s, %s, %s, %s, %s)
+        ON CONFLICT (month, category, currency) DO UPDATE SET
+            total_amount = monthly_category_spend.total_amount + EXCLUDED.total_amount,
+            spend = monthly_category_spend.spend + EXCLUDED.spend,
+            income = monthly_category_spend.income + EXCLUDED.income,
+            transaction_count = monthly_category_spend.transaction_count + EXCLUDED.transaction_count
+    """
+    # Sorted keys keep the row lock order stable between concurrent Lambdas
+    cursor.executemany(upsert_sql, [key + tuple(totals) for key, totals in sorted(deltas.items())])
+    print(f"📈 Updated {len(deltas)} monthly category spend aggregates")
+
+def open_csv_stream(body, object_key):
+    # Decompress on the fly based on the key suffix — the file is never held in memory as a whole
+    if object_key.endswith(".gz"):
+        # Compression modules are only imported by the code paths that need them
+        import gzip
+        print("🗜️ Decompressing gzip stream")
+        body = gzip.GzipFile(fileobj=body, mode="rb")
+    elif object_key.endswith(".zst"):
+        # zstandard has to be provided by a layer
+        import zstandard
+        print("🗜️ Decompressing zstd stream")
+        body = zstandard.ZstdDecompressor().stream_reader(body)
+    return io.TextIOWrapper(body, encoding="utf-8", newline="")
+
+def claim_file(cursor, source):
+    # Records (object_key, etag) in the load transaction; False when the file was already
+    # loaded — SQS redeliveries and retries of committed files are skipped. A concurrent load
+    # of the same file waits on the primary key until the first one commits or rolls back.
+    cursor.execute(
+        "INSERT INTO loaded_files (object_key, etag) VALUES (%s, %s) ON CONFLICT DO NOTHING",
+        source
+    )
+    return cursor.rowcount == 1
+
+def row_month(row):
+    # Month of the partition a row goes to: its transaction date, else its booking date
+    for value in row[:2]:
+        try:
+            return datetime.strptime(value.strip(), "%Y-%m-%d").date().replace(day=1)
+        except ValueError:
+            continue
+    return None
+
+def file_months(stream):
+    # First pass over a file — only the months its rows fall into
+    csv_reader = csv.reader(stream, delimiter=";")
+    next(csv_reader, None)
+    return {month for month in map(row_month, csv_reader) if month}
+
+def s3_stream_opener(s3, bucket_name, object_key, response):
+    # Returns a function giving a new decompressed text stream of the object on every call.
+    # The first call reuses the already opened response, later ones fetch the object again,
+    # pinned to the same ETag so both passes of load_csv read the same content.
+    responses = [response]
+
+    def open_stream():
+        if responses:
+            body = responses.pop()["Body"]
+        else:
+            body = s3.get_object(Bucket=bucket_name, Key=object_key, IfMatch=response["ETag"])["Body"]
+        return open_csv_stream(body, object_key)
+
+    return open_stream
+
+def process_csv_file(csv_content, db_config, archive_destination=None, source_name="local.csv"):
     print("🚀 Connecting to database...")
     conn = psycopg2.connect(**db_config)
-    cursor = conn.cursor()
+    archive = ParquetArchiveWriter(archive_destination, source_name) if archive_destination else None
+    try:
+        load_csv(conn, csv_content, archive)
+    finally:
+        conn.close()
+
+def load_csv(conn, csv_content, archive=None, source=None):
+    # Inserts one file in a single transaction on an already open connection.
+    # source is (object_key, etag) of an S3 object; it is recorded in loaded_files in the same
+    # transaction, and a file recorded before is not loaded again.
+    # With an archive, the same typed rows are also written as Parquet after the commit.
+    # csv_content is the whole file as a string, or a function returning a new text stream of it:
+    # the file is streamed twice — first for its months, whose partitions are created before the
+    # load transaction, then for the rows — so it is never held in memory as a whole.
+    if isinstance(csv_content, str):
+        text = csv_content
+        csv_content = lambda: io.StringIO(text)
 
-    csv_reader = csv.reader(StringIO(csv_content), delimiter=";")
+    with csv_content() as stream:
+        ensure_partitions(conn, file_months(stream))
+
+    csv_reader = csv.reader(csv_content(), delimiter=";")
     headers = next(csv_reader)
     print(f"🧾 CSV headers: {headers}")
 
+    # Every row is inserted under a savepoint, sent in the same round trip: a failing INSERT
+    # (e.g. a too long currency) only rolls back that row instead of aborting the file's transaction
     insert_sql = """
+        SAVEPOINT row;
         INSERT INTO transactions (
             transaction_date, booking_date, reject_date,
             amount, currency, sender_receiver, description,
             product, transaction_type, order_amount, order_currency,
-            status, balance_after
-        ) VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s)
+            status, balance_after, category, category_rule
+        ) VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s);
+        RELEASE SAVEPOINT row;
     """
 
+    cursor = conn.cursor()
+    if source and not claim_file(cursor, source):
+        conn.rollback()
+        cursor.close()
+        print(f"⏭️ Skipping {source[0]} (ETag {source[1]}), already loaded")
+        return
+
     row_count = 0
+    spend_deltas = {}
+    categorized_count = 0
+    categorize_seconds = 0.0
     for row in csv_reader:
         parsed_row = parse_row(row)
+        if parsed_row[0] is None:
+            # transaction_date is the partition key and cannot be NULL — fall back to the
+            # booking date, as migrate_partitioning.sql does for existing rows
+            parsed_row[0] = parsed_row[1]
+        if parsed_row[0] is None:
+            print(f"⚠️ Skipping row without transaction and booking date: {row}")
+            continue
+        start = time.perf_counter()
+        category, category_rule = categorize(parsed_row[6], parsed_row[5], parsed_row[7])
+        categorize_seconds += time.perf_counter() - start
         try:
-            cursor.execute(insert_sql, parsed_row)
-            row_count += 1
-            if row_count % 50 == 0:
-                print(f"📊 Inserted {row_count} rows so far...")
-        except Exception as e:
+            cursor.execute(insert_sql, parsed_row + [category, category_rule])
+        except psycopg2.Error as e:
+            if e.pgcode is None:
+                # Raised before anything reached the server — there is no savepoint to return to
+                raise
+            # The skipped row is left out of the aggregates and the archive as well
+            cursor.execute("ROLLBACK TO SAVEPOINT row; RELEASE SAVEPOINT row")
             print(f"❌ Failed to insert row {row}: {e}")
+            continue
+        add_to_monthly_spend(spend_deltas, parsed_row, category)
+        if archive:
+            archive.add(parsed_row + [category, category_rule])
+        row_count += 1
+        if category:
+            categorized_count += 1
+        if row_count % 50 == 0:
+            print(f"📊 Inserted {row_count} rows so far...")
 
+    # Aggregates are committed together with the rows they summarize
+    update_monthly_spend(cursor, spend_deltas)
+    if source:
+        cursor.execute(
+            "UPDATE loaded_files SET row_count = %s WHERE object_key = %s AND etag = %s",
+            (row_count,) + tuple(source)
+        )
     conn.commit()
     cursor.close()
-    conn.close()
+
+    if archive:
+        # Rows are already committed — a failed archive must not fail (and reload) the file
+        try:
+            archive.close()
+        except Exception as e:
+            print(f"❌ Failed to write Parquet archive: {e}")
     print(f"✅ Finished. Inserted {row_count} rows into RDS.")
+    if row_count:
+        print(f"🏷️ Categorized {categorized_count}/{row_count} rows, "
+              f"{categorize_seconds / row_count * 1_000_000:.1f} µs/row")
+
+def s3_object_keys(event):
+    # Yields (message_id, object_key) for SQS-wrapped S3 events and for direct S3 events.
+    # object_key is None when an SQS message cannot be parsed, so it is reported as failed.
+    for record in event.get("Records", []):
+        if record.get("eventSource") != "aws:sqs":
+            try:
+                object_key = unquote_plus(record["s3"]["object"]["key"])
+            except Exception as e:
+                # Nothing to report back to for a direct invocation — log and skip, as before SQS
+                print(f"❌ Failed to parse S3 event: {e}")
+                continue
+            yield None, object_key
+            continue
+
+        message_id = record["messageId"]
+        try:
+            body = json.loads(record["body"])
+            if body.get("Event") == "s3:TestEvent":
+                print("🧪 Skipping S3 test event")
+                continue
+            for s3_record in body["Records"]:
+                yield message_id, unquote_plus(s3_record["s3"]["object"]["key"])
+        except Exception as e:
+            print(f"❌ Failed to parse SQS message {message_id}: {e}")
+            yield message_id, None
+
+def batch_response(failed_message_ids):
+    # Partial batch response — only failed messages return to the queue (and end up in the DLQ)
+    return {"batchItemFailures": [{"itemIdentifier": message_id} for message_id in sorted(failed_message_ids)]}
+
+# DB credentials fetched once per container — warm invocations skip the Secrets Manager call
+db_credentials = {}
+
+def get_db_credentials(secret_arn):
+    if secret_arn not in db_credentials:
+        print("🔍 Fetching DB credentials from Secrets Manager...")
+        secrets = get_client("secretsmanager")
+        secret_value = secrets.get_secret_value(SecretId=secret_arn)
+        db_credentials[secret_arn] = json.loads(secret_value["SecretString"])
+        print("🔐 Retrieved DB credentials from Secrets Manager")
+    return db_credentials[secret_arn]
+
+def report_init_timings(first_invocation_ms):
+    # Single JSON line, easy to filter in CloudWatch Logs Insights
+    print(json.dumps({"cold_start": INIT_TIMINGS, "first_invocation_ms": first_invocation_ms}))
 
 def main(event, context):
+    global cold_start
+    start = time.perf_counter()
+    try:
+        return handle_event(event)
+    finally:
+        if cold_start:
+            cold_start = False
+            report_init_timings(round((time.perf_counter() - start) * 1000, 2))
+
+def handle_event(event):
     print("🔔 Lambda triggered")
 
+    objects = list(s3_object_keys(event))
+    all_message_ids = {message_id for message_id, _ in objects if message_id}
+    failed_message_ids = {message_id for message_id, object_key in objects if object_key is None}
+    objects = [(message_id, object_key) for message_id, object_key in objects if object_key is not None]
+    print(f"📦 Received {len(objects)} S3 object(s): {[object_key for _, object_key in objects]}")
+    if not objects:
+        return batch_response(failed_message_ids)
+
     try:
         bucket_name = os.environ["BUCKET_NAME"]
         secret_arn = os.environ["SECRET_ARN"]
         db_host = os.environ["RDS_ENDPOINT"]
         db_port = os.environ["RDS_PORT"]
         db_name = os.environ["DB_NAME"]
+        # Optional: s3://bucket/prefix or a local directory for the Parquet archive
+        archive_destination = os.environ.get("PARQUET_ARCHIVE")
         print(f"🌍 Loaded environment variables: bucket={bucket_name}, db={db_name}@{db_host}:{db_port}")
     except Exception as e:
         print(f"❌ Failed to load environment variables: {e}")
-        return
-
-    try:
-        s3_event = event["Records"][0]["s3"]
-        object_key = s3_event["object"]["key"]
-        print(f"📦 S3 event received: key={object_key}")
-    except Exception as e:
-        print(f"❌ Failed to parse S3 event: {e}")
-        return
-
-    try:
-        s3 = boto3.client("s3")
-        print("⏳ Attempting to read from S3...")
-        response = s3.get_object(Bucket=bucket_name, Key=object_key)
-        print("📥 CSV file read successfully from S3")
-        csv_content = response["Body"].read().decode("utf-8")
-        print(f"📄 CSV file read from S3, size: {len(csv_content)} bytes")
-    except Exception as e:
-        print(f"❌ Failed to read CSV from S3: {e}")
-        return
+        return batch_response(all_message_ids)
 
     try:
-        print("🔍 Fetching DB credentials from Secrets Manager...")
-        secrets = boto3.client("secretsmanager")
-        secret_value = secrets.get_secret_value(SecretId=secret_arn)
-        print("🔐 Secret retrieved")
-        secret_dict = json.loads(secret_value["SecretString"])
-        print("🔐 Retrieved DB credentials from Secrets Manager")
+        secret_dict = get_db_credentials(secret_arn)
     except Exception as e:
         print(f"❌ Failed to retrieve DB credentials: {e}")
-        return
+        return batch_response(all_message_ids)
 
     db_config = {
         "host": db_host,
@@ -137,6 +387,31 @@ def main(event, context):
     }
 
     try:
-        process_csv_file(csv_content, db_config)
+        print("🚀 Connecting to database...")
+        conn = psycopg2.connect(**db_config)
     except Exception as e:
-        print(f"❌ Error processing CSV file: {e}")
+        print(f"❌ Failed to connect to database: {e}")
+        return batch_response(all_message_ids)
+
+    # One connection for the whole batch, one transaction per file
+    s3 = get_client("s3")
+    try:
+        for message_id, object_key in objects:
+            try:
+                print(f"⏳ Attempting to read {object_key} from S3...")
+                response = s3.get_object(Bucket=bucket_name, Key=object_key)
+                print(f"📥 CSV object opened in S3, size: {response['ContentLength']} bytes")
+                archive = None
+                if archive_destination:
+                    archive = ParquetArchiveWriter(archive_destination, object_key, get_client("s3"))
+                source = (object_key, response["ETag"].strip('"'))
+                load_csv(conn, s3_stream_opener(s3, bucket_name, object_key, response), archive, source)
+            except Exception as e:
+                print(f"❌ Error processing CSV file {object_key}: {e}")
+                conn.rollback()
+                if message_id:
+                    failed_message_ids.add(message_id)
+    finally:
+        conn.close()
+
+    return batch_response(failed_message_ids)
@@ -0,0 +1,4 @@
+-- Adds the keyword rule that decided the category of each row.
+-- Run once via pgAdmin 4 (or psql) after migrate_monthly_spend.sql and before deploying the Lambda.
+
+ALTER TABLE transactions ADD COLUMN IF NOT EXISTS category_rule TEXT;
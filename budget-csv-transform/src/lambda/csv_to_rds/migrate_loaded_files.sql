@@ -0,0 +1,12 @@
+-- Adds the record of loaded S3 objects that makes repeated deliveries of a file a no-op.
+-- Run once via pgAdmin 4 (or psql) before deploying the Lambda.
+
+CREATE TABLE IF NOT EXISTS loaded_files (
+    object_key TEXT NOT NULL,
+    etag TEXT NOT NULL,
+    row_count INTEGER,
+    loaded_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    PRIMARY KEY (object_key, etag)
+);
+
+GRANT INSERT, SELECT, UPDATE, DELETE ON TABLE loaded_files TO budgetadmin;
@@ -0,0 +1,73 @@
+-- Adds incrementally maintained monthly category spend aggregates to an existing database.
+-- Run once via pgAdmin 4 (or psql) after migrate_partitioning.sql and before deploying the Lambda.
+
+BEGIN;
+
+ALTER TABLE transactions ADD COLUMN IF NOT EXISTS category TEXT;
+
+-- Spend per month, category and currency, maintained incrementally by the Lambda
+-- in the same transaction as the inserted rows. Reports read this instead of transactions.
+CREATE TABLE monthly_category_spend (
+    month DATE NOT NULL,
+    category TEXT NOT NULL,
+    currency VARCHAR(10) NOT NULL,
+    total_amount NUMERIC(14, 2) NOT NULL DEFAULT 0,
+    spend NUMERIC(14, 2) NOT NULL DEFAULT 0,
+    income NUMERIC(14, 2) NOT NULL DEFAULT 0,
+    transaction_count INTEGER NOT NULL DEFAULT 0,
+    PRIMARY KEY (month, category, currency)
+);
+
+-- Full recompute from transactions — the source of truth for the consistency check
+CREATE VIEW monthly_category_spend_recomputed AS
+SELECT
+    date_trunc('month', transaction_date)::DATE AS month,
+    COALESCE(category, 'UNCATEGORIZED') AS category,
+    COALESCE(currency, 'UNKNOWN') AS currency,
+    COALESCE(SUM(amount), 0) AS total_amount,
+    COALESCE(-SUM(amount) FILTER (WHERE amount < 0), 0) AS spend,
+    COALESCE(SUM(amount) FILTER (WHERE amount > 0), 0) AS income,
+    COUNT(*)::INTEGER AS transaction_count
+FROM transactions
+GROUP BY 1, 2, 3;
+
+-- Rows where the incremental aggregates differ from a full recompute (empty when consistent)
+CREATE VIEW monthly_category_spend_drift AS
+SELECT
+    COALESCE(a.month, r.month) AS month,
+    COALESCE(a.category, r.category) AS category,
+    COALESCE(a.currency, r.currency) AS currency,
+    a.total_amount AS stored_total,
+    r.total_amount AS recomputed_total,
+    a.transaction_count AS stored_count,
+    r.transaction_count AS recomputed_count
+FROM monthly_category_spend a
+FULL OUTER JOIN monthly_category_spend_recomputed r
+    ON a.month = r.month AND a.category = r.category AND a.currency = r.currency
+WHERE a.month IS NULL OR r.month IS NULL
+   OR (a.total_amount, a.spend, a.income, a.transaction_count)
+      IS DISTINCT FROM (r.total_amount, r.spend, r.income, r.transaction_count);
+
+-- Rebuilds the aggregates from scratch, e.g. after manual edits of transactions
+CREATE OR REPLACE FUNCTION rebuild_monthly_category_spend()
+RETURNS INTEGER
+LANGUAGE plpgsql
+AS $$
+DECLARE
+    row_total INTEGER;
+BEGIN
+    LOCK TABLE monthly_category_spend IN EXCLUSIVE MODE;
+    DELETE FROM monthly_category_spend;
+    INSERT INTO monthly_category_spend SELECT * FROM monthly_category_spend_recomputed;
+    GET DIAGNOSTICS row_total = ROW_COUNT;
+    RETURN row_total;
+END;
+$$;
+
+GRANT INSERT, SELECT, UPDATE, DELETE ON TABLE monthly_category_spend TO budgetadmin;
+GRANT SELECT ON monthly_category_spend_recomputed, monthly_category_spend_drift TO budgetadmin;
+
+-- Initial fill from the existing transactions
+SELECT rebuild_monthly_category_spend();
+
+COMMIT;
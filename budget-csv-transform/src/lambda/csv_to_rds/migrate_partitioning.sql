@@ -0,0 +1,94 @@
+-- Migration of an existing single-heap transactions table to monthly range partitions.
+-- Run once via pgAdmin 4 (or psql) BEFORE deploying the Lambda that creates partitions.
+-- The old table is kept as transactions_legacy so benchmark_queries.py can compare both;
+-- drop it once the numbers look good:  DROP TABLE transactions_legacy;
+
+BEGIN;
+
+ALTER TABLE transactions RENAME TO transactions_legacy;
+ALTER TABLE transactions_legacy RENAME CONSTRAINT transactions_pkey TO transactions_legacy_pkey;
+ALTER SEQUENCE transactions_id_seq RENAME TO transactions_legacy_id_seq;
+
+CREATE TABLE transactions (
+    id BIGSERIAL,
+    transaction_date DATE NOT NULL,
+    booking_date DATE,
+    reject_date DATE,
+    amount NUMERIC(12, 2),
+    currency VARCHAR(10),
+    sender_receiver TEXT,
+    description TEXT,
+    product TEXT,
+    transaction_type TEXT,
+    order_amount NUMERIC(12, 2),
+    order_currency VARCHAR(10),
+    status TEXT,
+    balance_after NUMERIC(12, 2),
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    PRIMARY KEY (id, transaction_date)
+) PARTITION BY RANGE (transaction_date);
+
+CREATE OR REPLACE FUNCTION ensure_transactions_partition(day DATE)
+RETURNS TEXT
+LANGUAGE plpgsql
+AS $$
+DECLARE
+    month_start DATE := date_trunc('month', day)::DATE;
+    partition_name TEXT := format('transactions_%s', to_char(month_start, 'YYYY_MM'));
+BEGIN
+    IF to_regclass(partition_name) IS NULL THEN
+        -- Called in a short transaction of its own, so the ACCESS EXCLUSIVE lock taken by
+        -- PARTITION OF is released right away. A concurrent Lambda may create the same
+        -- partition first, in which case its catalog row conflicts with ours.
+        BEGIN
+            EXECUTE format(
+                'CREATE TABLE IF NOT EXISTS %I PARTITION OF transactions FOR VALUES FROM (%L) TO (%L)',
+                partition_name, month_start, (month_start + INTERVAL '1 month')::DATE
+            );
+        EXCEPTION WHEN duplicate_table OR unique_violation THEN
+            NULL;
+        END;
+    END IF;
+    RETURN partition_name;
+END;
+$$;
+
+-- One partition per month present in the old data.
+-- Rows without transaction_date fall back to booking_date, then to the load date.
+SELECT ensure_transactions_partition(month)
+FROM (
+    SELECT DISTINCT date_trunc('month', COALESCE(transaction_date, booking_date, created_at::DATE))::DATE AS month
+    FROM transactions_legacy
+) months;
+
+-- Copy in date order so BRIN ranges stay tight; ids are preserved
+INSERT INTO transactions (
+    id, transaction_date, booking_date, reject_date,
+    amount, currency, sender_receiver, description,
+    product, transaction_type, order_amount, order_currency,
+    status, balance_after, created_at
+)
+SELECT
+    id, COALESCE(transaction_date, booking_date, created_at::DATE), booking_date, reject_date,
+    amount, currency, sender_receiver, description,
+    product, transaction_type, order_amount, order_currency,
+    status, balance_after, created_at
+FROM transactions_legacy
+ORDER BY 2, id;
+
+SELECT setval('transactions_id_seq', COALESCE((SELECT MAX(id) FROM transactions), 0) + 1, false);
+
+CREATE INDEX transactions_transaction_date_brin ON transactions USING BRIN (transaction_date);
+CREATE INDEX transactions_booking_date_brin ON transactions USING BRIN (booking_date);
+
+CREATE EXTENSION IF NOT EXISTS pg_trgm;
+CREATE INDEX transactions_description_trgm ON transactions USING GIN (description gin_trgm_ops);
+CREATE INDEX transactions_sender_receiver_trgm ON transactions USING GIN (sender_receiver gin_trgm_ops);
+
+GRANT INSERT, SELECT, UPDATE, DELETE ON TABLE transactions TO budgetadmin;
+GRANT USAGE, SELECT ON SEQUENCE transactions_id_seq TO budgetadmin;
+
+COMMIT;
+
+ANALYZE transactions;
+ANALYZE transactions_legacy;
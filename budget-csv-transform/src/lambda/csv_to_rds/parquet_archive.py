@@ -0,0 +1,80 @@
+# parquet_archive.py
+#
+# Optional columnar archive of the parsed, typed rows of every loaded file, partitioned
+# Hive-style by year and month:
+#
+#   <destination>/year=2025/month=3/<source file>.parquet
+#
+# destination is either "s3://bucket/prefix" or a local directory. pyarrow is imported
+# only when an archive is written — in Lambda it comes from a layer (e.g. AWS SDK for pandas).
+
+import io
+import os
+import re
+
+# Column names match the transactions table
+COLUMNS = [
+    "transaction_date", "booking_date", "reject_date",
+    "amount", "currency", "sender_receiver", "description",
+    "product", "transaction_type", "order_amount", "order_currency",
+    "status", "balance_after", "category", "category_rule",
+]
+
+def archive_schema():
+    import pyarrow as pa
+
+    money = pa.decimal128(12, 2)
+    types = {
+        "transaction_date": pa.date32(), "booking_date": pa.date32(), "reject_date": pa.date32(),
+        "amount": money, "order_amount": money, "balance_after": money,
+    }
+    return pa.schema([(name, types.get(name, pa.string())) for name in COLUMNS] + [("source_key", pa.string())])
+
+def archive_file_name(object_key):
+    # Deterministic per source file, so reloading the same upload overwrites its archive files
+    base_name = re.sub(r"\.csv(\.gz|\.zst)?$", "", object_key)
+    return re.sub(r"[^A-Za-z0-9._-]+", "_", base_name).strip("_") + ".parquet"
+
+class ParquetArchiveWriter:
+    """Collects rows of one source file per month and writes them as Parquet on close()."""
+
+    def __init__(self, destination, object_key, s3_client=None):
+        self.destination = destination.rstrip("/")
+        self.object_key = object_key
+        self.s3_client = s3_client
+        self.months = {}
+
+    def add(self, row):
+        # row is in COLUMNS order, as inserted into transactions
+        columns = self.months.setdefault((row[0].year, row[0].month), [[] for _ in COLUMNS])
+        for values, value in zip(columns, row):
+            values.append(value)
+
+    def close(self):
+        if not self.months:
+            return []
+
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+
+        schema = archive_schema()
+        file_name = archive_file_name(self.object_key)
+        written = []
+        for (year, month), columns in sorted(self.months.items()):
+            arrays = columns + [[self.object_key] * len(columns[0])]
+            table = pa.Table.from_arrays([pa.array(values, type=field.type) for values, field in zip(arrays, schema)], schema=schema)
+            path = f"{self.destination}/year={year}/month={month}/{file_name}"
+            self.write_table(table, path, pq)
+            written.append(path)
+        print(f"🗄️ Archived {sum(len(columns[0]) for columns in self.months.values())} rows as Parquet in {len(written)} file(s)")
+        return written
+
+    def write_table(self, table, path, pq):
+        if path.startswith("s3://"):
+            bucket, key = path[len("s3://"):].split("/", 1)
+            buffer = io.BytesIO()
+            pq.write_table(table, buffer, compression="zstd")
+            self.s3_client.put_object(Bucket=bucket, Key=key, Body=buffer.getvalue())
+        else:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            pq.write_table(table, path, compression="zstd")
@@ -0,0 +1,175 @@
+# replay_events.py
+#
+# Fires N synthetic upload events at handler.main with in-memory stand-ins for S3,
+# Secrets Manager and Postgres, to measure throughput and connection saturation.
+#
+#   python replay_events.py --files 200 --mode direct --concurrency 50   # S3 → Lambda, one file per invocation
+#   python replay_events.py --files 200 --mode sqs --concurrency 2       # S3 → SQS → Lambda, batches of 10
+#
+# Latencies of the stand-ins are rough t3.micro-in-VPC figures and can be tuned with options.
+
+import argparse
+import contextlib
+import io
+import json
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import handler
+
+class TooManyConnections(Exception):
+    pass
+
+class FakePostgres:
+    """Counts open connections and refuses new ones above max_connections, like Postgres does."""
+
+    def __init__(self, max_connections, connect_seconds, statement_seconds):
+        self.max_connections = max_connections
+        self.connect_seconds = connect_seconds
+        self.statement_seconds = statement_seconds
+        self.lock = threading.Lock()
+        self.open = 0
+        self.peak = 0
+        self.refused = 0
+        self.statements = 0
+
+    def connect(self, **db_config):
+        time.sleep(self.connect_seconds)
+        with self.lock:
+            if self.open >= self.max_connections:
+                self.refused += 1
+                raise TooManyConnections("FATAL: sorry, too many clients already")
+            self.open += 1
+            self.peak = max(self.peak, self.open)
+        return FakeConnection(self)
+
+    def closed(self):
+        with self.lock:
+            self.open -= 1
+
+    def executed(self, count=1):
+        # Statements of concurrent connections share the CPU of the instance
+        with self.lock:
+            self.statements += count
+            load = self.open
+        time.sleep(self.statement_seconds * count * max(1, load / 2))
+
+class FakeConnection:
+    def __init__(self, db):
+        self.db = db
+
+    def cursor(self):
+        return FakeCursor(self.db)
+
+    def commit(self):
+        self.db.executed()
+
+    def rollback(self):
+        pass
+
+    def close(self):
+        self.db.closed()
+
+class FakeCursor:
+    def __init__(self, db):
+        self.db = db
+        # Every replayed file is new, so its loaded_files insert always succeeds
+        self.rowcount = 1
+
+    def execute(self, sql, params=None):
+        self.db.executed()
+
+    def executemany(self, sql, rows):
+        self.db.executed(len(rows))
+
+    def fetchone(self):
+        return ("transactions_replay",)
+
+    def close(self):
+        pass
+
+class FakeS3:
+    def __init__(self, payload, get_seconds):
+        self.payload = payload
+        self.get_seconds = get_seconds
+
+    def get_object(self, Bucket, Key, IfMatch=None):
+        time.sleep(self.get_seconds)
+        return {"Body": io.BytesIO(self.payload), "ContentLength": len(self.payload), "ETag": '"replay"'}
+
+class FakeSecretsManager:
+    def get_secret_value(self, SecretId):
+        return {"SecretString": json.dumps({"username": "budgetadmin", "password": "replay"})}
+
+class FakeBoto3:
+    def __init__(self, s3):
+        self.clients = {"s3": s3, "secretsmanager": FakeSecretsManager()}
+
+    def client(self, name, **kwargs):
+        return self.clients[name]
+
+def s3_record(object_key):
+    return {"eventSource": "aws:s3", "s3": {"bucket": {"name": "replay"}, "object": {"key": object_key}}}
+
+def build_events(files, mode, batch_size):
+    keys = [f"uploads/replay_{number:05d}.csv" for number in range(files)]
+    if mode == "direct":
+        return [{"Records": [s3_record(key)]} for key in keys]
+
+    events = []
+    for start in range(0, files, batch_size):
+        events.append({"Records": [
+            {"eventSource": "aws:sqs", "messageId": key, "body": json.dumps({"Records": [s3_record(key)]})}
+            for key in keys[start:start + batch_size]
+        ]})
+    return events
+
+def main():
+    parser = argparse.ArgumentParser(description="Replay synthetic upload events against handler.main")
+    parser.add_argument("--files", type=int, default=100, help="Number of uploaded files")
+    parser.add_argument("--mode", choices=["direct", "sqs"], default="sqs", help="S3 → Lambda or S3 → SQS → Lambda")
+    parser.add_argument("--concurrency", type=int, default=2, help="Parallel Lambda invocations")
+    parser.add_argument("--batch-size", type=int, default=10, help="SQS messages per invocation")
+    parser.add_argument("--csv", default="test.csv", help="File served for every S3 object")
+    parser.add_argument("--max-connections", type=int, default=20, help="Postgres max_connections available to the Lambda")
+    parser.add_argument("--connect-ms", type=float, default=30.0, help="Connection setup time")
+    parser.add_argument("--statement-ms", type=float, default=0.5, help="Statement time on an idle instance")
+    parser.add_argument("--s3-ms", type=float, default=20.0, help="S3 GetObject latency")
+    args = parser.parse_args()
+
+    with open(args.csv, "rb") as f:
+        payload = f.read()
+
+    db = FakePostgres(args.max_connections, args.connect_ms / 1000, args.statement_ms / 1000)
+    handler.boto3 = FakeBoto3(FakeS3(payload, args.s3_ms / 1000))
+    handler.psycopg2 = db
+    os.environ.update({
+        "BUCKET_NAME": "replay", "SECRET_ARN": "replay", "DB_NAME": "postgres",
+        "RDS_ENDPOINT": "localhost", "RDS_PORT": "5432",
+    })
+
+    events = build_events(args.files, args.mode, args.batch_size)
+    failed = 0
+
+    start = time.perf_counter()
+    # handler logs every row — keep the replay output readable
+    with contextlib.redirect_stdout(io.StringIO()):
+        with ThreadPoolExecutor(max_workers=args.concurrency) as pool:
+            for response in pool.map(lambda event: handler.main(event, None), events):
+                if args.mode == "sqs":
+                    failed += len(response["batchItemFailures"])
+    elapsed = time.perf_counter() - start
+
+    # direct S3 invocations have no retry channel — a refused connection means a lost file
+    if args.mode == "direct":
+        failed = db.refused
+
+    print(f"📊 mode={args.mode} files={args.files} invocations={len(events)} concurrency={args.concurrency}")
+    print(f"⏱️ {elapsed:.2f} s, {args.files / elapsed:.1f} files/s, {db.statements / elapsed:.0f} statements/s")
+    print(f"🔌 peak connections {db.peak}/{args.max_connections}, refused {db.refused}")
+    print(f"❌ failed files {failed}")
+
+if __name__ == "__main__":
+    main()
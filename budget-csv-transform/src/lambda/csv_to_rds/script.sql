@@ -1,6 +1,8 @@
+-- Transactions are range partitioned by transaction_date month.
+-- The partition key has to be part of the primary key, so transaction_date is NOT NULL.
 CREATE TABLE transactions (
-    id SERIAL PRIMARY KEY,
-    transaction_date DATE,
+    id BIGSERIAL,
+    transaction_date DATE NOT NULL,
     booking_date DATE,
     reject_date DATE,
     amount NUMERIC(12, 2),
@@ -13,9 +15,121 @@ CREATE TABLE transactions (
     order_currency VARCHAR(10),
     status TEXT,
     balance_after NUMERIC(12, 2),
-    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+    category TEXT,
+    category_rule TEXT,
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    PRIMARY KEY (id, transaction_date)
+) PARTITION BY RANGE (transaction_date);
+
+-- Creates the monthly partition holding the given day (no-op if it already exists).
+-- Called by the Lambda for every month found in an uploaded file.
+CREATE OR REPLACE FUNCTION ensure_transactions_partition(day DATE)
+RETURNS TEXT
+LANGUAGE plpgsql
+AS $$
+DECLARE
+    month_start DATE := date_trunc('month', day)::DATE;
+    partition_name TEXT := format('transactions_%s', to_char(month_start, 'YYYY_MM'));
+BEGIN
+    IF to_regclass(partition_name) IS NULL THEN
+        -- Called in a short transaction of its own, so the ACCESS EXCLUSIVE lock taken by
+        -- PARTITION OF is released right away. A concurrent Lambda may create the same
+        -- partition first, in which case its catalog row conflicts with ours.
+        BEGIN
+            EXECUTE format(
+                'CREATE TABLE IF NOT EXISTS %I PARTITION OF transactions FOR VALUES FROM (%L) TO (%L)',
+                partition_name, month_start, (month_start + INTERVAL '1 month')::DATE
+            );
+        EXCEPTION WHEN duplicate_table OR unique_violation THEN
+            NULL;
+        END;
+    END IF;
+    RETURN partition_name;
+END;
+$$;
+
+-- BRIN indexes are tiny and fit date columns of append-only, date-ordered data
+CREATE INDEX transactions_transaction_date_brin ON transactions USING BRIN (transaction_date);
+CREATE INDEX transactions_booking_date_brin ON transactions USING BRIN (booking_date);
+
+-- Trigram indexes for ILIKE '%merchant%' searches
+CREATE EXTENSION IF NOT EXISTS pg_trgm;
+CREATE INDEX transactions_description_trgm ON transactions USING GIN (description gin_trgm_ops);
+CREATE INDEX transactions_sender_receiver_trgm ON transactions USING GIN (sender_receiver gin_trgm_ops);
+
+-- Spend per month, category and currency, maintained incrementally by the Lambda
+-- in the same transaction as the inserted rows. Reports read this instead of transactions.
+CREATE TABLE monthly_category_spend (
+    month DATE NOT NULL,
+    category TEXT NOT NULL,
+    currency VARCHAR(10) NOT NULL,
+    total_amount NUMERIC(14, 2) NOT NULL DEFAULT 0,
+    spend NUMERIC(14, 2) NOT NULL DEFAULT 0,
+    income NUMERIC(14, 2) NOT NULL DEFAULT 0,
+    transaction_count INTEGER NOT NULL DEFAULT 0,
+    PRIMARY KEY (month, category, currency)
+);
+
+-- Full recompute from transactions — the source of truth for the consistency check
+CREATE VIEW monthly_category_spend_recomputed AS
+SELECT
+    date_trunc('month', transaction_date)::DATE AS month,
+    COALESCE(category, 'UNCATEGORIZED') AS category,
+    COALESCE(currency, 'UNKNOWN') AS currency,
+    COALESCE(SUM(amount), 0) AS total_amount,
+    COALESCE(-SUM(amount) FILTER (WHERE amount < 0), 0) AS spend,
+    COALESCE(SUM(amount) FILTER (WHERE amount > 0), 0) AS income,
+    COUNT(*)::INTEGER AS transaction_count
+FROM transactions
+GROUP BY 1, 2, 3;
+
+-- Rows where the incremental aggregates differ from a full recompute (empty when consistent)
+CREATE VIEW monthly_category_spend_drift AS
+SELECT
+    COALESCE(a.month, r.month) AS month,
+    COALESCE(a.category, r.category) AS category,
+    COALESCE(a.currency, r.currency) AS currency,
+    a.total_amount AS stored_total,
+    r.total_amount AS recomputed_total,
+    a.transaction_count AS stored_count,
+    r.transaction_count AS recomputed_count
+FROM monthly_category_spend a
+FULL OUTER JOIN monthly_category_spend_recomputed r
+    ON a.month = r.month AND a.category = r.category AND a.currency = r.currency
+WHERE a.month IS NULL OR r.month IS NULL
+   OR (a.total_amount, a.spend, a.income, a.transaction_count)
+      IS DISTINCT FROM (r.total_amount, r.spend, r.income, r.transaction_count);
+
+-- Rebuilds the aggregates from scratch, e.g. after manual edits of transactions
+CREATE OR REPLACE FUNCTION rebuild_monthly_category_spend()
+RETURNS INTEGER
+LANGUAGE plpgsql
+AS $$
+DECLARE
+    row_total INTEGER;
+BEGIN
+    LOCK TABLE monthly_category_spend IN EXCLUSIVE MODE;
+    DELETE FROM monthly_category_spend;
+    INSERT INTO monthly_category_spend SELECT * FROM monthly_category_spend_recomputed;
+    GET DIAGNOSTICS row_total = ROW_COUNT;
+    RETURN row_total;
+END;
+$$;
+
+-- S3 objects already loaded, recorded by the Lambda in the same transaction as their rows and
+-- aggregates. Redelivered or retried SQS messages for a committed file are skipped; a re-upload
+-- with different content has a new ETag and is loaded.
+CREATE TABLE loaded_files (
+    object_key TEXT NOT NULL,
+    etag TEXT NOT NULL,
+    row_count INTEGER,
+    loaded_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    PRIMARY KEY (object_key, etag)
 );
 
 GRANT INSERT, SELECT, UPDATE, DELETE ON TABLE transactions TO budgetadmin;
+GRANT INSERT, SELECT, UPDATE, DELETE ON TABLE monthly_category_spend TO budgetadmin;
+GRANT INSERT, SELECT, UPDATE, DELETE ON TABLE loaded_files TO budgetadmin;
+GRANT SELECT ON monthly_category_spend_recomputed, monthly_category_spend_drift TO budgetadmin;
 
 GRANT USAGE, SELECT ON SEQUENCE transactions_id_seq TO budgetadmin;
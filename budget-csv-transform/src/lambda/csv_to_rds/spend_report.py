@@ -0,0 +1,82 @@
+# spend_report.py
+#
+# Monthly category spend report read from the monthly_category_spend aggregates.
+#
+#   python spend_report.py --from-month 2025-01 --to-month 2025-03
+#   python spend_report.py --check      # compare aggregates with a full recompute
+#   python spend_report.py --rebuild    # recompute aggregates from transactions
+
+import argparse
+import os
+
+import psycopg2
+
+db_config = {
+    "host": os.environ.get("DB_HOST", "localhost"),
+    "port": os.environ.get("DB_PORT", "5432"),
+    "dbname": os.environ.get("DB_NAME", "budget"),
+    "user": os.environ.get("DB_USER", "budgetadmin"),
+    "password": os.environ.get("DB_PASSWORD", ""),
+}
+
+def print_report(cursor, from_month, to_month, currency):
+    cursor.execute("""
+        SELECT month, category, currency, spend, income, transaction_count
+        FROM monthly_category_spend
+        WHERE month BETWEEN %s AND %s AND (%s IS NULL OR currency = %s)
+        ORDER BY month, spend DESC, category
+    """, (f"{from_month}-01", f"{to_month}-01", currency, currency))
+
+    current_month = None
+    for month, category, row_currency, spend, income, count in cursor.fetchall():
+        if month != current_month:
+            current_month = month
+            print(f"\n📅 {month:%Y-%m}")
+        print(f"  {category:20} {spend:>12} {row_currency:4} ({count} transactions, income {income})")
+
+def check_consistency(cursor):
+    cursor.execute("SELECT * FROM monthly_category_spend_drift ORDER BY month, category, currency")
+    drift = cursor.fetchall()
+    if not drift:
+        print("✅ Aggregates match a full recompute of transactions")
+        return True
+
+    print(f"❌ {len(drift)} aggregate rows differ from a full recompute:")
+    for month, category, currency, stored_total, recomputed_total, stored_count, recomputed_count in drift:
+        print(f"  {month} {category:20} {currency:4} stored={stored_total} ({stored_count}) "
+              f"recomputed={recomputed_total} ({recomputed_count})")
+    print("💡 Run with --rebuild to recompute the aggregates")
+    return False
+
+def main():
+    parser = argparse.ArgumentParser(description="Monthly category spend report")
+    parser.add_argument("--from-month", help="First month, e.g. 2025-01")
+    parser.add_argument("--to-month", help="Last month, e.g. 2025-03 (defaults to --from-month)")
+    parser.add_argument("--currency", default=None, help="Only show one currency, e.g. PLN")
+    parser.add_argument("--check", action="store_true", help="Compare aggregates with a full recompute")
+    parser.add_argument("--rebuild", action="store_true", help="Recompute aggregates from transactions")
+    args = parser.parse_args()
+
+    conn = psycopg2.connect(**db_config)
+    cursor = conn.cursor()
+
+    if args.rebuild:
+        cursor.execute("SELECT rebuild_monthly_category_spend()")
+        print(f"🔁 Rebuilt {cursor.fetchone()[0]} aggregate rows")
+        conn.commit()
+
+    ok = True
+    if args.check:
+        ok = check_consistency(cursor)
+
+    if args.from_month:
+        print_report(cursor, args.from_month, args.to_month or args.from_month, args.currency)
+    elif not (args.check or args.rebuild):
+        parser.error("one of --from-month, --check or --rebuild is required")
+
+    cursor.close()
+    conn.close()
+    raise SystemExit(0 if ok else 1)
+
+if __name__ == "__main__":
+    main()
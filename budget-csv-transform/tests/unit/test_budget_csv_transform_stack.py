@@ -1,15 +1,39 @@
 import aws_cdk as core
 import aws_cdk.assertions as assertions
 
-from budget_csv_transform.budget_csv_transform_stack import BudgetCsvTransformStack
+from src.budget_csv_transform_stack import BudgetCsvTransformStack
 
-# example tests. To run these tests, uncomment this file along with the example
-# resource in budget_csv_transform/budget_csv_transform_stack.py
+# To run these tests: cd budget-csv-transform && python -m pytest tests
 def test_sqs_queue_created():
     app = core.App()
     stack = BudgetCsvTransformStack(app, "budget-csv-transform")
     template = assertions.Template.from_stack(stack)
 
-#     template.has_resource_properties("AWS::SQS::Queue", {
-#         "VisibilityTimeout": 300
-#     })
+    template.resource_count_is("AWS::SQS::Queue", 2)
+    template.has_resource_properties("AWS::SQS::Queue", {
+        "VisibilityTimeout": 1800,
+        "RedrivePolicy": {"maxReceiveCount": 3}
+    })
+
+    template.has_resource_properties("AWS::Lambda::EventSourceMapping", {
+        "BatchSize": 10,
+        "MaximumBatchingWindowInSeconds": 30,
+        "ScalingConfig": {"MaximumConcurrency": 2},
+        "FunctionResponseTypes": ["ReportBatchItemFailures"]
+    })
+
+def notification_suffixes(**kwargs):
+    app = core.App()
+    template = assertions.Template.from_stack(BudgetCsvTransformStack(app, "budget-csv-transform", **kwargs))
+    return sorted(
+        rule["Value"]
+        for resource in template.find_resources("Custom::S3BucketNotifications").values()
+        for config in resource["Properties"]["NotificationConfiguration"]["QueueConfigurations"]
+        for rule in config["Filter"]["Key"]["FilterRules"]
+    )
+
+def test_zstd_uploads_need_layer():
+    assert notification_suffixes() == [".csv", ".csv.gz"]
+    assert notification_suffixes(
+        zstd_layer_arn="arn:aws:lambda:eu-central-1:123456789012:layer:zstandard-layer:1"
+    ) == [".csv", ".csv.gz", ".csv.zst"]
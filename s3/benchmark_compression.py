@@ -0,0 +1,129 @@
+"""
+Benchmark of compressed uploads on generated bank exports.
+
+Generates exports in the bank CSV format, compresses them the same way as
+uploader.py does and measures size, compression time and the time the Lambda
+spends decompressing and parsing the stream.
+"""
+
+import csv
+import gzip
+import io
+import os
+import random
+import tempfile
+import time
+from datetime import date, timedelta
+
+import click
+
+from uploader import compress_file
+
+HEADER = [
+    'Data transakcji', 'Data zaksięgowania', 'Data odrzucenia', 'Kwota', 'Waluta',
+    'Nadawca / odbiorca', 'Opis', 'Produkt', 'Typ transakcji', 'Kwota zlecenia',
+    'Waluta zlecenia', 'Status', 'Saldo po transakcji',
+]
+
+MERCHANTS = [
+    ('PayU\nGrunwaldzka 186 60-166 Poznan\n60-166 Poznan', 'Allegro zamowienie'),
+    ('BIEDRONKA 1234\nKOZUCHOW', 'KOZUCHOW BIEDRONKA 1234 K.1 POL'),
+    ('ORLEN STACJA NR 4410\nNOWA SOL', 'NOWA SOL ORLEN STACJA NR 4410 POL'),
+    ('ZABKA Z8812 K.1\nZIELONA GORA', 'ZIELONA GORA ZABKA Z8812 K.1 POL'),
+    ('Netflix International B.V.\nAmsterdam NL', 'NETFLIX.COM'),
+    ('APTEKA POD LIPAMI\nKOZUCHOW', 'KOZUCHOW APTEKA POD LIPAMI POL'),
+]
+
+
+def format_amount(value):
+    return f"{value:,.2f}".replace(',', ' ').replace('.', ',').replace('-', '- ')
+
+
+def generate_export(file_name, rows, seed=42):
+    """Write a synthetic export with the given number of rows."""
+    rng = random.Random(seed)
+    day = date(2020, 1, 1)
+    balance = 10000.0
+
+    with open(file_name, 'w', encoding='utf-8', newline='') as f:
+        writer = csv.writer(f, delimiter=';', quoting=csv.QUOTE_MINIMAL)
+        writer.writerow(HEADER)
+        for _ in range(rows):
+            day += timedelta(days=rng.random() < 0.3)
+            amount = -round(rng.uniform(1, 500), 2)
+            balance += amount
+            account = ''.join(rng.choice('0123456789') for _ in range(26))
+            receiver, description = rng.choice(MERCHANTS)
+            writer.writerow([
+                day.isoformat(), day.isoformat(), '', format_amount(amount), 'PLN',
+                f"{account}\n{receiver}", description, 'Karta Mastercard', 'Płatność kartą',
+                format_amount(amount), 'PLN', 'Zaksięgowana', format_amount(balance),
+            ])
+
+
+def parse_stream(raw, compression):
+    """Decompress and parse a stream the same way handler.main does."""
+    if compression == 'gzip':
+        raw = gzip.GzipFile(fileobj=raw, mode='rb')
+    elif compression == 'zstd':
+        import zstandard
+        raw = zstandard.ZstdDecompressor().stream_reader(raw)
+    reader = csv.reader(io.TextIOWrapper(raw, encoding='utf-8', newline=''), delimiter=';')
+    return sum(1 for _ in reader)
+
+
+def timed(fn, repeat):
+    best = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = fn()
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best, result
+
+
+@click.command()
+@click.option('--rows', default=[10000, 100000], multiple=True, show_default=True,
+              help='Liczba wierszy w wygenerowanym eksporcie (można podać kilka razy)')
+@click.option('--bandwidth-mbps', default=50.0, show_default=True,
+              help='Przepustowość łącza do S3 użyta do oszacowania czasu transferu')
+@click.option('--repeat', default=3, show_default=True, help='Liczba powtórzeń pomiaru')
+def main(rows, bandwidth_mbps, repeat):
+    """Porównuje wysyłanie surowych i skompresowanych eksportów CSV."""
+    compressions = [None, 'gzip']
+    try:
+        import zstandard  # noqa: F401
+        compressions.append('zstd')
+    except ImportError:
+        print("⚠️ Brak pakietu 'zstandard' — pomijam zstd")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        for row_count in rows:
+            file_name = os.path.join(tmp, f'export_{row_count}.csv')
+            generate_export(file_name, row_count)
+            raw_size = os.path.getsize(file_name)
+            print(f"\n📊 {row_count} wierszy, {raw_size / 1024:.0f} KiB")
+            print(f"{'format':8} {'rozmiar KiB':>12} {'ratio':>7} {'kompresja s':>12} "
+                  f"{'transfer s':>11} {'parsowanie s':>13} {'razem s':>9}")
+
+            for compression in compressions:
+                if compression is None:
+                    with open(file_name, 'rb') as f:
+                        payload = f.read()
+                    compress_time = 0.0
+                else:
+                    def compress():
+                        with compress_file(file_name, compression) as body:
+                            return body.read()
+                    compress_time, payload = timed(compress, repeat)
+
+                parse_time, parsed = timed(lambda: parse_stream(io.BytesIO(payload), compression), repeat)
+                transfer_time = len(payload) * 8 / (bandwidth_mbps * 1_000_000)
+                total = compress_time + transfer_time + parse_time
+                print(f"{compression or 'csv':8} {len(payload) / 1024:12.0f} {raw_size / len(payload):7.1f} "
+                      f"{compress_time:12.3f} {transfer_time:11.3f} {parse_time:13.3f} {total:9.3f}")
+                assert parsed == row_count + 1
+
+
+if __name__ == '__main__':
+    main()
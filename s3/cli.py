@@ -1,16 +1,18 @@
 import click
-from uploader import upload_file_to_s3
+from uploader import upload_file_to_s3, COMPRESSION_SUFFIXES
 
 @click.command()
 @click.argument('file_name', type=click.Path(exists=True))
 @click.option('--bucket', required=True, help='Nazwa bucketu S3, np. "moj-bucket"')
 @click.option('--object-name', default=None, help='Ścieżka w S3 (opcjonalnie)')
-def main(file_name, bucket, object_name):
+@click.option('--compress', type=click.Choice(sorted(COMPRESSION_SUFFIXES)), default=None,
+              help='Kompresja pliku przed wysłaniem (opcjonalnie)')
+def main(file_name, bucket, object_name, compress):
     """Wysyła plik do S3.
 
     FILE_NAME – lokalna ścieżka do pliku
     """
-    upload_file_to_s3(file_name, bucket, object_name)
+    upload_file_to_s3(file_name, bucket, object_name, compression=compress)
 
 if __name__ == '__main__':
     main()
@@ -1,19 +1,63 @@
+import gzip
+import shutil
+import tempfile
+
 import boto3
 from botocore.exceptions import NoCredentialsError
 
-def upload_file_to_s3(file_name, bucket, object_name=None):
+# Suffix appended to the object name for each supported compression
+COMPRESSION_SUFFIXES = {
+    'gzip': '.gz',
+    'zstd': '.zst',
+}
+
+# Files up to this size are compressed in memory, bigger ones spill to a temp file
+SPOOL_MAX_SIZE = 16 * 1024 * 1024
+CHUNK_SIZE = 1024 * 1024
+
+
+def compress_file(file_name, compression, level=None):
+    """Compress a local file chunk by chunk and return a readable file object."""
+    spool = tempfile.SpooledTemporaryFile(max_size=SPOOL_MAX_SIZE)
+
+    with open(file_name, 'rb') as source:
+        if compression == 'gzip':
+            with gzip.GzipFile(fileobj=spool, mode='wb', compresslevel=level or 6, mtime=0) as target:
+                shutil.copyfileobj(source, target, CHUNK_SIZE)
+        elif compression == 'zstd':
+            # zstandard is optional — only needed when zstd compression is requested
+            import zstandard
+            compressor = zstandard.ZstdCompressor(level=level or 10)
+            compressor.copy_stream(source, spool, read_size=CHUNK_SIZE, write_size=CHUNK_SIZE)
+        else:
+            raise ValueError(f"Unsupported compression: {compression}")
+
+    spool.seek(0)
+    return spool
+
+
+def upload_file_to_s3(file_name, bucket, object_name=None, compression=None):
     # If object_name is not specified, use the local file name
     if object_name is None:
         object_name = file_name
 
+    if compression is not None:
+        object_name += COMPRESSION_SUFFIXES[compression]
+
     # S3 client initialization
     s3_client = boto3.client('s3')
 
     try:
-        s3_client.upload_file(file_name, bucket, object_name)
+        if compression is None:
+            s3_client.upload_file(file_name, bucket, object_name)
+        else:
+            with compress_file(file_name, compression) as body:
+                s3_client.upload_fileobj(body, bucket, object_name)
         print(f"✅ Plik '{file_name}' został wysłany do S3 jako '{object_name}' w buckecie '{bucket}'")
     except FileNotFoundError:
         print("❌ Plik nie został znaleziony.")
+    except ImportError:
+        print("❌ Kompresja zstd wymaga pakietu 'zstandard' (pip install zstandard).")
     except NoCredentialsError:
         print("❌ Brak poświadczeń AWS.")
     except Exception as e:
@@ -7,6 +7,7 @@ This will pre-fill many categories automatically, making manual work much easier
 import pandas as pd
 import re
 import csv
+from transactions_reader import load_categories, read_export_csv
 
 def clean_csv_newlines(input_file, cleaned_file):
     """
@@ -59,48 +60,12 @@ def auto_categorize_transactions(input_file, output_file):
     """Auto-categorize transactions based on keyword matching."""
     
     print(f"📊 Loading {input_file}...")
-    df = pd.read_csv(input_file, sep=';', encoding='utf-8')
+    df = read_export_csv(input_file)
     
     print(f"✅ Found {len(df)} transactions")
     
-    # Your categories and keywords
-    categories = {
-        'SMALL_SHOPS': ['DEALZ', 'bakaliowesmaki', 'SPAR', 'SKLEP RYBNY', 'Konotop PUH JOZEFOW RYSZARD', 'ZABKA', 'ZYGULA', 'Piekarnia', 'WIELOBRANZOWY', 'DELIKATESY MIESNE', 'ROGAL', 'FIVE', 'LEKS', 'ODiDO', 'PROACTIVE ZAJAC', 'MOTYKA', 'EMI S.C', 'CUKIERNIA SNICKERS', 'DANIEL FIJO', 'WEDLINDROBEX'],
-        'MARKETS': ['DINO', 'NETTO', 'BIEDRONKA', 'CARREFOUR', 'LIDL'],
-        'ALLEGRO': ['Allegro'],
-        'OLX': ['olx.pl'],
-        'VINTED': ['VINTED'],
-        'PEPCO': ['PEPCO'],
-        'PETROL': ['STACJA PALIW', 'LOTOS', 'ORLEN', 'CIRCLE', 'NOWA SOL MOL'],
-        'MEDICINE': ['APTEKA'],
-        'DOCTORS': ['MEDICUS', 'ALDEMED', 'PERINATEA'],
-        'DENTISTRY': ['STOMATOLOGIA'],
-        'DIABETIC': ['diabetyk24', 'HEROKU', 'Aero-Medika', 'sugarcubes', 'equil'],
-        'TOOLS_SHOPS': ['MROWKA', 'GRANAT'],
-        'GAMES': ['GOGcomECOM', 'Steam', 'STEAM', 'PlayStation'],
-        'MEDIA': ['YouTubePremium', 'rp.pl', 'Netflix', 'NETFLIX', 'Google Play', 'help.max.com', 'YouTube', 'NBA League Pass', 'SKYSHOWTIME'],
-        'ORANGE': ['FLEX'],
-        'CLOTHS': ['HM', 'BERSHKA', 'STRADIVARIUS', 'zalando', 'miluba.pl', 'smyk', 'SECRET', 'SINSAY', 'kappahl', 'MEDICINE', 'HOUSE', 'RESERVED', 'HM POL', 'GALANTERIA ODZIEZOWA', 'HEBE', 'CROPP', 'vinted'],
-        'CAR_SHOWER': ['WIKON', 'Myjnia'],
-        'SHOES': ['Deichmann', 'nbsklep', 'CCC', 'e-cizemka', 'ccc.eu', 'eobuwie', 'zapato'],
-        'COSMETICS': ['ROSSMANN', 'SZALATA CHLEBOWSKA'],
-        'EMPIK': ['EMPIK'],
-        'RESTAURANT': ['DA GRASSO', 'BON BON', 'DOLCE VITA', 'PIZZERIA LUCA', 'STACJA CAFE', 'CAFE SAN-REMO', 'GRYCAN LODY OD POKOLEN', 'TOMASZ KUROS', 'ZIELONA GORA BW SPOLKA Z O.O.', 'MOCCA', 'KARMEL', 'SLOW FOOD', 'Verde', 'EWA DA', 'STARA PIEKARNIA', 'MCDONALDS', 'TCHIBO', 'PIJALNIA KAWY I CZEKO', 'KUCHNIE SWIATA', 'HEBAN', 'Ohy', 'KRATKA', 'Wafelek i Kulka', 'CIACHOO', 'PIERINO', 'CAFFETTERIA GELATERIA'],
-        'MIEDZYZDROJE': ['MIEDZYZDROJE'],
-        'CINEMA': ['DOM KULTURY', 'cinema-city'],
-        'SPORT': ['www.decathlon.pl', 'MARTES'],
-        'HAIR_CUT': ['FRYZJERSKI', 'FRYZJERSKA'],
-        'PETS': ['PATIVET', 'KAKADU'],
-        'ENGLISH': ['edoo'],
-        'CASH_MACHINE': ['PLANET CASH', 'KOZUCHOW FILIA', 'NOWA SOL BS NOWA SOL'],
-        'CARD_SERVICE': ['OBSLUGE KARTY'],
-        'CAR_MECHANIC': ['EXPORT IMPORT LESZEK'],
-        'SALETNIK': ['Opłata za terapię', 'Opłata za psychoterapię'],
-        'PSYCHOTERAPIA': ['koleo', 'Wroclaw', 'WROCLAW', 'UBER', 'SWIETEJ DOM PIELGRZYMA'],
-        'METLIFE': ['21754947'],
-        'FARM': ['ZIELONY ZAKATEK', 'OGRODNICZO', 'CENTRUM OGRODNICZE', 'ATO'],
-        'WAKACJE_JANOWICE': ['KOWARY', 'Kowary', 'Janowice', 'Mala Upa', 'Jelenia Gora', 'SZRENICA', 'szrenica', 'SZKLARSKA', 'KARPNIKI', ' STARA STAJNIA']
-    }
+    # Your categories and keywords — shared with the ingest-time categorization of the Lambda
+    categories = load_categories()
     
     # Add Category column if it doesn't exist
     if 'Category' not in df.columns:
@@ -112,10 +77,13 @@ def auto_categorize_transactions(input_file, output_file):
     auto_categorized = 0
     for idx, row in df.iterrows():
         if pd.isna(row['Category']) or row['Category'].strip() == '':
-            # Combine all text fields - use correct column names
+            # Combine all text fields - use correct column names. Raw bank exports have a single
+            # 'Nadawca / odbiorca' column, which is what the Lambda matches as sender_receiver
             nadawca = row.get('Nadawca', '')
             odbiorca = row.get('Odbiorca', '')
-            combined_text = f"{row['Opis']} {nadawca} {odbiorca} {row['Produkt']}".lower()
+            nadawca_odbiorca = row.get('Nadawca / odbiorca', '')
+            parties = ' '.join(str(value) for value in [nadawca, odbiorca, nadawca_odbiorca] if not pd.isna(value) and value != '')
+            combined_text = f"{row['Opis']} {parties} {row['Produkt']}".lower()
             
             # Check each category
             for category, keywords in categories.items():
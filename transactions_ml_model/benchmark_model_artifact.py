@@ -0,0 +1,97 @@
+#!/usr/bin/env python3
+"""
+Benchmark of the model artifact formats of SimpleTransactionCategorizer.
+
+Trains on generated transactions (your categories and keywords with random noise),
+saves the old single joblib pickle and the versioned artifact directory (raw and with the
+default compressed forest), and reports artifact size against the old format, load time and
+first-prediction latency.
+"""
+
+import contextlib
+import io
+import os
+import random
+import sys
+import tempfile
+import time
+
+import pandas as pd
+
+from simple_ml_categorizer import SimpleTransactionCategorizer
+
+CITIES = ['KOZUCHOW', 'NOWA SOL', 'ZIELONA GORA', 'WROCLAW', 'POZNAN', 'WARSZAWA']
+
+
+def generate_training_csv(csv_file, rows, seed=42):
+    """Write a categorized export with keyword-based descriptions."""
+    rng = random.Random(seed)
+    categories = SimpleTransactionCategorizer().categories
+    names = list(categories)
+    records = []
+    for _ in range(rows):
+        category = rng.choice(names)
+        keyword = rng.choice(categories[category])
+        records.append({
+            'Opis': f"{rng.choice(CITIES)} {keyword} {rng.randint(1000, 9999)} K.{rng.randint(1, 9)} POL",
+            'Nadawca': f"557464------{rng.randint(1000, 9999)} JAN KOWALSKI",
+            'Odbiorca': '',
+            'Produkt': rng.choice(['Karta Mastercard', 'Konto Osobiste']),
+            'Category': category,
+        })
+    pd.DataFrame(records).to_csv(csv_file, sep=';', index=False, encoding='utf-8')
+
+
+def artifact_size(path):
+    if os.path.isfile(path):
+        return os.path.getsize(path)
+    return sum(os.path.getsize(os.path.join(path, name)) for name in os.listdir(path))
+
+
+def measure(path, repeat):
+    """Best load time and first-prediction latency over `repeat` fresh loads."""
+    best_load, best_first = None, None
+    for _ in range(repeat):
+        categorizer = SimpleTransactionCategorizer()
+        with contextlib.redirect_stdout(io.StringIO()):
+            start = time.perf_counter()
+            categorizer.load_model(path)
+            loaded = time.perf_counter()
+            categorizer.predict('KOZUCHOW NETTO 5204 K.3 POL', '557464------1444 JAN KOWALSKI', '', 'Karta Mastercard')
+            predicted = time.perf_counter()
+        load, first = loaded - start, predicted - loaded
+        best_load = load if best_load is None else min(best_load, load)
+        best_first = first if best_first is None else min(best_first, first)
+    return best_load, best_first
+
+
+def main(rows=20000, repeat=5):
+    with tempfile.TemporaryDirectory() as tmp:
+        csv_file = os.path.join(tmp, 'train.csv')
+        generate_training_csv(csv_file, rows)
+
+        categorizer = SimpleTransactionCategorizer()
+        with contextlib.redirect_stdout(io.StringIO()):
+            categorizer.train(csv_file)
+
+        artifacts = {
+            'joblib (old)': os.path.join(tmp, 'model.joblib'),
+            'artifact compress=0': os.path.join(tmp, 'model_raw'),
+            'artifact compress=3': os.path.join(tmp, 'model'),
+        }
+        with contextlib.redirect_stdout(io.StringIO()):
+            categorizer.save_model(artifacts['joblib (old)'])
+            categorizer.save_model(artifacts['artifact compress=0'], compress=0)
+            categorizer.save_model(artifacts['artifact compress=3'])
+
+        print(f"📊 {rows} training rows, {len(categorizer.model.classes_)} categories")
+        old_size = artifact_size(artifacts['joblib (old)'])
+        print(f"{'format':22} {'size KiB':>10} {'vs old':>7} {'load ms':>9} {'first prediction ms':>20}")
+        for name, path in artifacts.items():
+            load, first = measure(path, repeat)
+            size = artifact_size(path)
+            print(f"{name:22} {size / 1024:10.0f} {size / old_size:6.0%} {load * 1000:9.1f} {first * 1000:20.1f}")
+
+
+if __name__ == '__main__':
+    main(*(int(arg) for arg in sys.argv[1:]))
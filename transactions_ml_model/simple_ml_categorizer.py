@@ -10,7 +10,21 @@ from sklearn.ensemble import RandomForestClassifier
 from sklearn.model_selection import train_test_split
 from sklearn.metrics import accuracy_score, classification_report
 import joblib
+import hashlib
+import json
+import os
 import re
+from datetime import datetime, timezone
+from transactions_reader import load_categories, read_categorizer_data, read_export_csv, CATEGORIZER_EXPORT_COLUMNS
+
+# Version of the directory artifact written by save_model (manifest.json + arrays)
+ARTIFACT_FORMAT_VERSION = 1
+
+# TfidfVectorizer parameters recorded in the manifest and used to rebuild it on load
+FEATURE_CONFIG_KEYS = [
+    'max_features', 'ngram_range', 'lowercase', 'analyzer', 'token_pattern', 'strip_accents',
+    'min_df', 'max_df', 'binary', 'norm', 'use_idf', 'smooth_idf', 'sublinear_tf',
+]
 
 class SimpleTransactionCategorizer:
     """Simple ML model for transaction categorization."""
@@ -19,44 +33,11 @@ class SimpleTransactionCategorizer:
         self.vectorizer = TfidfVectorizer(max_features=1000, ngram_range=(1, 2))
         self.model = RandomForestClassifier(n_estimators=100, random_state=42)
         self.is_trained = False
+        self.training_info = {}
+        self.manifest = None
         
-        # Your specific categories and keywords
-        self.categories = {
-            'SMALL_SHOPS': ['DEALZ', 'bakaliowesmaki', 'SPAR', 'SKLEP RYBNY', 'Konotop PUH JOZEFOW RYSZARD', 'ZABKA', 'ZYGULA', 'Piekarnia', 'WIELOBRANZOWY', 'DELIKATESY MIESNE', 'ROGAL', 'FIVE', 'LEKS', 'ODiDO', 'PROACTIVE ZAJAC', 'MOTYKA', 'EMI S.C', 'CUKIERNIA SNICKERS', 'DANIEL FIJO', 'WEDLINDROBEX'],
-            'MARKETS': ['DINO', 'NETTO', 'BIEDRONKA', 'CARREFOUR', 'LIDL'],
-            'ALLEGRO': ['Allegro'],
-            'OLX': ['olx.pl'],
-            'PEPCO': ['PEPCO'],
-            'PETROL': ['STACJA PALIW', 'LOTOS', 'ORLEN', 'CIRCLE', 'NOWA SOL MOL'],
-            'MEDICINE': ['APTEKA'],
-            'DOCTORS': ['MEDICUS', 'ALDEMED', 'PERINATEA'],
-            'DENTISTRY': ['STOMATOLOGIA'],
-            'DIABETIC': ['diabetyk24', 'HEROKU', 'Aero-Medika', 'sugarcubes', 'equil'],
-            'TOOLS_SHOPS': ['MROWKA', 'GRANAT'],
-            'GAMES': ['GOGcomECOM', 'Steam', 'STEAM', 'PlayStation'],
-            'MEDIA': ['YouTubePremium', 'rp.pl', 'Netflix', 'NETFLIX', 'Google Play', 'help.max.com', 'YouTube', 'NBA League Pass', 'SKYSHOWTIME'],
-            'ORANGE': ['FLEX'],
-            'CLOTHS': ['HM', 'BERSHKA', 'STRADIVARIUS', 'zalando', 'miluba.pl', 'smyk', 'SECRET', 'SINSAY', 'kappahl', 'MEDICINE', 'HOUSE', 'RESERVED', 'HM POL', 'GALANTERIA ODZIEZOWA', 'HEBE', 'CROPP', 'vinted'],
-            'CAR_SHOWER': ['WIKON', 'Myjnia'],
-            'SHOES': ['Deichmann', 'nbsklep', 'CCC', 'e-cizemka', 'ccc.eu', 'eobuwie', 'zapato'],
-            'COSMETICS': ['ROSSMANN', 'SZALATA CHLEBOWSKA'],
-            'EMPIK': ['EMPIK'],
-            'RESTAURANT': ['DA GRASSO', 'BON BON', 'DOLCE VITA', 'PIZZERIA LUCA', 'STACJA CAFE', 'CAFE SAN-REMO', 'GRYCAN LODY OD POKOLEN', 'TOMASZ KUROS', 'ZIELONA GORA BW SPOLKA Z O.O.', 'MOCCA', 'KARMEL', 'SLOW FOOD', 'Verde', 'EWA DA', 'STARA PIEKARNIA', 'MCDONALDS', 'TCHIBO', 'PIJALNIA KAWY I CZEKO', 'KUCHNIE SWIATA', 'HEBAN', 'Ohy', 'KRATKA', 'Wafelek i Kulka', 'CIACHOO', 'PIERINO', 'CAFFETTERIA GELATERIA'],
-            'MIEDZYZDROJE': ['MIEDZYZDROJE'],
-            'CINEMA': ['DOM KULTURY', 'cinema-city'],
-            'SPORT': ['www.decathlon.pl', 'MARTES'],
-            'HAIR_CUT': ['FRYZJERSKI', 'FRYZJERSKA'],
-            'PETS': ['PATIVET', 'KAKADU'],
-            'ENGLISH': ['edoo'],
-            'CASH_MACHINE': ['PLANET CASH', 'KOZUCHOW FILIA', 'NOWA SOL BS NOWA SOL'],
-            'CARD_SERVICE': ['OBSLUGE KARTY'],
-            'CAR_MECHANIC': ['EXPORT IMPORT LESZEK'],
-            'SALETNIK': ['Opłata za terapię', 'Opłata za psychoterapię'],
-            'PSYCHOTERAPIA': ['koleo', 'Wroclaw', 'WROCLAW', 'UBER', 'SWIETEJ DOM PIELGRZYMA'],
-            'METLIFE': ['21754947'],
-            'FARM': ['ZIELONY ZAKATEK', 'OGRODNICZO', 'CENTRUM OGRODNICZE', 'ATO'],
-            'WAKACJE_JANOWICE': ['KOWARY', 'Kowary', 'Janowice', 'Mala Upa', 'Jelenia Gora', 'SZRENICA', 'szrenica', 'SZKLARSKA', 'KARPNIKI', ' STARA STAJNIA']
-        }
+        # Your specific categories and keywords (shared with auto_categorize.py and the Lambda)
+        self.categories = load_categories()
     
     def clean_text(self, text):
         """Clean and prepare text for ML."""
@@ -87,11 +68,11 @@ class SimpleTransactionCategorizer:
     
     def prepare_data(self, df):
         """Prepare data for training."""
-        # Clean text fields
-        df['description_clean'] = df['Opis'].apply(self.clean_text)
-        df['nadawca_clean'] = df['Nadawca'].apply(self.clean_text)
-        df['odbiorca_clean'] = df['Odbiorca'].apply(self.clean_text)
-        df['product_clean'] = df['Produkt'].apply(self.clean_text)
+        # Clean text fields (as plain objects — categorical columns would stay categorical)
+        df['description_clean'] = df['Opis'].astype(object).apply(self.clean_text)
+        df['nadawca_clean'] = df['Nadawca'].astype(object).apply(self.clean_text)
+        df['odbiorca_clean'] = df['Odbiorca'].astype(object).apply(self.clean_text)
+        df['product_clean'] = df['Produkt'].astype(object).apply(self.clean_text)
         
         # Combine all text fields
         df['combined_text'] = (
@@ -103,12 +84,15 @@ class SimpleTransactionCategorizer:
         
         return df
     
-    def train(self, csv_file):
-        """Train the model on categorized data."""
+    def train(self, csv_file, months=None):
+        """Train the model on categorized data (a CSV file or a Parquet archive directory)."""
         print(f"📊 Loading data from {csv_file}...")
         
-        # Load data
-        df = pd.read_csv(csv_file, sep=';', encoding='utf-8')
+        # Load data — the Parquet archive only reads the needed columns and months
+        if os.path.isdir(csv_file) or csv_file.startswith('s3://'):
+            df = read_categorizer_data(csv_file, months=months)
+        else:
+            df = read_export_csv(csv_file, columns=CATEGORIZER_EXPORT_COLUMNS)
         
         # Check if Category column exists
         if 'Category' not in df.columns:
@@ -128,8 +112,13 @@ class SimpleTransactionCategorizer:
         df_processed = self.prepare_data(df_categorized)
         
         # Get features and labels
-        X = df_processed['combined_text'].values
-        y = df_processed['Category'].values
+        X = df_processed['combined_text'].to_numpy()
+        y = df_processed['Category'].to_numpy()
+        
+        # Fingerprint of the training data, recorded in the saved artifact
+        data_hash = hashlib.sha256()
+        for text, label in zip(X, y):
+            data_hash.update(f"{text}\t{label}\n".encode('utf-8'))
         
         # Vectorize text
         X_vectorized = self.vectorizer.fit_transform(X)
@@ -157,6 +146,18 @@ class SimpleTransactionCategorizer:
             if isinstance(metrics, dict) and 'precision' in metrics:
                 print(f"{category:20}: Precision={metrics['precision']:.3f}, Recall={metrics['recall']:.3f}")
         
+        self.training_info = {
+            'training_data_sha256': data_hash.hexdigest(),
+            'training_rows': int(len(y)),
+            'metrics': {
+                'accuracy': float(accuracy),
+                'per_category': {
+                    category: {name: float(value) for name, value in metrics.items()}
+                    for category, metrics in report.items() if isinstance(metrics, dict)
+                },
+            },
+        }
+        self.manifest = None
         self.is_trained = True
         return True
     
@@ -193,8 +194,8 @@ class SimpleTransactionCategorizer:
         
         print(f"📊 Predicting categories for {input_file}...")
         
-        # Load data
-        df = pd.read_csv(input_file, sep=';', encoding='utf-8')
+        # Load data (all columns — they are written back with the predictions)
+        df = read_export_csv(input_file)
         
         # Prepare data
         df_processed = self.prepare_data(df)
@@ -215,6 +216,9 @@ class SimpleTransactionCategorizer:
         # Add predictions to dataframe
         df['Predicted_Category'] = predictions
         df['Prediction_Confidence'] = confidences
+        if self.manifest:
+            # Lets cached predictions be matched against the model that produced them
+            df['Model_Id'] = self.manifest['model_id']
         
         # Save results
         df.to_csv(output_file, sep=';', index=False, encoding='utf-8')
@@ -227,28 +231,99 @@ class SimpleTransactionCategorizer:
         for category, count in category_counts.items():
             print(f"{category:20}: {count:3} transactions")
     
-    def save_model(self, filename='transaction_categorizer.joblib'):
-        """Save the trained model."""
+    def save_model(self, filename='transaction_categorizer', compress=3):
+        """Save the trained model.
+
+        A directory gets the versioned artifact: manifest.json, the vocabulary, IDF weights
+        and the forest, compressed with joblib's zlib level `compress` (0 stores it raw).
+        A *.joblib file name writes the old single pickle.
+        """
         if not self.is_trained:
             print("❌ Model not trained yet. Please train first.")
             return
         
-        model_data = {
-            'vectorizer': self.vectorizer,
-            'model': self.model
+        if filename.endswith('.joblib'):
+            model_data = {
+                'vectorizer': self.vectorizer,
+                'model': self.model
+            }
+            joblib.dump(model_data, filename)
+            print(f"💾 Model saved to {filename}")
+            return
+        
+        os.makedirs(filename, exist_ok=True)
+        
+        # Vocabulary as a plain list ordered by feature index
+        terms = sorted(self.vectorizer.vocabulary_, key=self.vectorizer.vocabulary_.get)
+        with open(os.path.join(filename, 'vocabulary.json'), 'w', encoding='utf-8') as f:
+            json.dump(terms, f, ensure_ascii=False)
+        
+        # Full precision — the weights are small, and rounding them changes predictions
+        idf = self.vectorizer.idf_.astype(np.float64)
+        np.save(os.path.join(filename, 'idf.npy'), idf)
+        
+        # The forest is nearly all of the artifact; its node arrays compress about 8x
+        joblib.dump(self.model, os.path.join(filename, 'forest.joblib'), compress=compress)
+        
+        params = self.vectorizer.get_params()
+        feature_config = {key: params[key] for key in FEATURE_CONFIG_KEYS}
+        model_id = hashlib.sha256(json.dumps(
+            [self.training_info.get('training_data_sha256'), feature_config, str(idf.dtype),
+             self.model.get_params()], sort_keys=True, default=str
+        ).encode('utf-8')).hexdigest()[:16]
+        
+        manifest = {
+            'format_version': ARTIFACT_FORMAT_VERSION,
+            'model_id': model_id,
+            'created_at': datetime.now(timezone.utc).isoformat(),
+            'training_data_sha256': self.training_info.get('training_data_sha256'),
+            'training_rows': self.training_info.get('training_rows'),
+            'classes': [str(category) for category in self.model.classes_],
+            'metrics': self.training_info.get('metrics'),
+            'feature_config': feature_config,
+            'vocabulary_size': len(terms),
+            'idf_dtype': str(idf.dtype),
+            'forest_compress': compress,
+            'model': {'type': type(self.model).__name__, 'params': self.model.get_params()},
         }
+        with open(os.path.join(filename, 'manifest.json'), 'w', encoding='utf-8') as f:
+            json.dump(manifest, f, indent=2, ensure_ascii=False, default=str)
         
-        joblib.dump(model_data, filename)
-        print(f"💾 Model saved to {filename}")
+        self.manifest = manifest
+        print(f"💾 Model {model_id} saved to {filename}/")
     
-    def load_model(self, filename='transaction_categorizer.joblib'):
-        """Load a trained model."""
+    def load_model(self, filename='transaction_categorizer'):
+        """Load a trained model (artifact directory or old *.joblib file)."""
         try:
-            model_data = joblib.load(filename)
-            self.vectorizer = model_data['vectorizer']
-            self.model = model_data['model']
+            if not os.path.isdir(filename):
+                model_data = joblib.load(filename)
+                self.vectorizer = model_data['vectorizer']
+                self.model = model_data['model']
+                self.manifest = None
+                self.is_trained = True
+                print(f"✅ Model loaded from {filename}")
+                return True
+            
+            with open(os.path.join(filename, 'manifest.json'), encoding='utf-8') as f:
+                manifest = json.load(f)
+            if manifest['format_version'] != ARTIFACT_FORMAT_VERSION:
+                print(f"❌ Unsupported model format version {manifest['format_version']}")
+                return False
+            
+            with open(os.path.join(filename, 'vocabulary.json'), encoding='utf-8') as f:
+                terms = json.load(f)
+            
+            feature_config = dict(manifest['feature_config'])
+            feature_config['ngram_range'] = tuple(feature_config['ngram_range'])
+            vectorizer = TfidfVectorizer(**feature_config, vocabulary={term: index for index, term in enumerate(terms)})
+            vectorizer.idf_ = np.load(os.path.join(filename, 'idf.npy')).astype(np.float64)
+            
+            self.vectorizer = vectorizer
+            self.model = joblib.load(os.path.join(filename, 'forest.joblib'))
+            self.training_info = {key: manifest[key] for key in ('training_data_sha256', 'training_rows', 'metrics')}
+            self.manifest = manifest
             self.is_trained = True
-            print(f"✅ Model loaded from {filename}")
+            print(f"✅ Model {manifest['model_id']} loaded from {filename}/")
             return True
         except Exception as e:
             print(f"❌ Failed to load model: {e}")
@@ -263,7 +338,7 @@ def main():
     
     # Check if we have categorized data
     try:
-        df = pd.read_csv('../s3/koszty_auto_categorized.csv', sep=';', encoding='utf-8')
+        df = read_export_csv('../s3/koszty_auto_categorized.csv', columns=['Category'])
         if 'Category' in df.columns and df['Category'].str.strip().ne('').any():
             print("✅ Found categorized data. Training model...")
             if categorizer.train('../s3/koszty_auto_categorized.csv'):
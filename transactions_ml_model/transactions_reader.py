@@ -0,0 +1,178 @@
+#!/usr/bin/env python3
+"""
+Readers for transaction data used by the ML tools.
+
+load_categories reads the keyword rules through the csv_to_rds Lambda's own loader.
+read_export_csv reads the bank's semicolon CSV export with the schema declared
+once in EXPORT_DTYPES. The Parquet archive is written by the csv_to_rds Lambda
+(PARQUET_ARCHIVE) or by process_csv_file(..., archive_destination=...) as
+year=YYYY/month=M/*.parquet. Both read only the requested columns.
+
+Run directly to compare load time and memory with a plain pd.read_csv:
+    python transactions_reader.py ../s3/koszty_auto_categorized.csv
+"""
+
+import csv
+import importlib.util
+import os
+import time
+
+import pandas as pd
+
+# Export schema: low-cardinality fields are categorical, everything else stays text.
+# Amounts ("- 70,00") and dates are kept as text so files round-trip unchanged.
+EXPORT_DTYPES = {
+    'Data transakcji': 'str',
+    'Data zaksięgowania': 'str',
+    'Data odrzucenia': 'str',
+    'Kwota': 'str',
+    'Waluta': 'category',
+    'Nadawca / odbiorca': 'str',
+    'Nadawca': 'str',
+    'Odbiorca': 'str',
+    'Opis': 'str',
+    'Produkt': 'category',
+    'Typ transakcji': 'category',
+    'Kwota zlecenia': 'str',
+    'Waluta zlecenia': 'category',
+    'Status': 'category',
+    'Saldo po transakcji': 'str',
+    'Category': 'str',
+}
+
+# The keyword rules (categories.json) and their loader belong to the csv_to_rds Lambda, which
+# ships them. This is the only place in the ML tools that knows where the Lambda sources live.
+CATEGORIZATION_MODULE = os.path.join(
+    os.path.dirname(os.path.abspath(__file__)),
+    '..', 'budget-csv-transform', 'src', 'lambda', 'csv_to_rds', 'categorization.py',
+)
+
+
+def load_categories():
+    """Category -> keywords, in matching order (the first matching category wins)."""
+    # categorization.py has no third-party imports, so it is loaded straight from its file
+    spec = importlib.util.spec_from_file_location('categorization', CATEGORIZATION_MODULE)
+    categorization = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(categorization)
+    return categorization.CATEGORIES
+
+
+# Columns the categorizers actually use
+CATEGORIZER_EXPORT_COLUMNS = ['Opis', 'Nadawca', 'Odbiorca', 'Produkt', 'Category']
+
+# pyarrow's multithreaded parser when installed, the default C parser otherwise
+FAST_ENGINE = 'pyarrow' if importlib.util.find_spec('pyarrow') else 'c'
+
+
+def read_export_csv(csv_file, columns=None):
+    """Read a semicolon CSV export with declared dtypes, keeping only the given columns (all by default)."""
+    if FAST_ENGINE == 'pyarrow':
+        df = _read_export_csv_pyarrow(csv_file, columns)
+    else:
+        df = pd.read_csv(
+            csv_file, sep=';', encoding='utf-8', dtype=EXPORT_DTYPES,
+            usecols=None if columns is None else lambda column: column in columns,
+        )
+
+    # An empty category means "not categorized yet", not a missing value
+    if 'Category' in df.columns:
+        df['Category'] = df['Category'].fillna('')
+    return df
+
+
+def _read_export_csv_pyarrow(csv_file, columns):
+    import pyarrow as pa
+    import pyarrow.csv as pa_csv
+
+    # The header is read once here and handed to pyarrow, which skips it
+    with open(csv_file, encoding='utf-8-sig', newline='') as f:
+        header = next(csv.reader(f, delimiter=';'))
+    usecols = [column for column in header if columns is None or column in columns]
+    types = {'str': pa.string(), 'category': pa.dictionary(pa.int32(), pa.string())}
+
+    table = pa_csv.read_csv(
+        csv_file,
+        read_options=pa_csv.ReadOptions(column_names=header, skip_rows=1),
+        # Raw exports have newlines inside quoted fields (sender addresses)
+        parse_options=pa_csv.ParseOptions(delimiter=';', newlines_in_values=True),
+        convert_options=pa_csv.ConvertOptions(
+            include_columns=usecols,
+            column_types={column: types[EXPORT_DTYPES.get(column, 'str')] for column in usecols},
+            # Empty fields become missing values, as with pd.read_csv
+            strings_can_be_null=True,
+        ),
+    )
+    return table.to_pandas()
+
+
+# Archive column -> column name used by auto_categorize.py and SimpleTransactionCategorizer
+EXPORT_COLUMN_NAMES = {
+    'description': 'Opis',
+    'sender_receiver': 'Nadawca',
+    'product': 'Produkt',
+    'category': 'Category',
+    'transaction_date': 'Data transakcji',
+    'amount': 'Kwota',
+    'currency': 'Waluta',
+    'status': 'Status',
+}
+
+CATEGORIZER_COLUMNS = ['description', 'sender_receiver', 'product', 'category']
+
+
+def read_parquet_archive(root, columns=None, months=None):
+    """Load archived transactions, reading only the given columns and months ('YYYY-MM')."""
+    import pyarrow.dataset as ds
+
+    dataset = ds.dataset(root, format='parquet', partitioning='hive')
+
+    month_filter = None
+    for month in months or []:
+        year_number, month_number = (int(part) for part in month.split('-'))
+        condition = (ds.field('year') == year_number) & (ds.field('month') == month_number)
+        month_filter = condition if month_filter is None else month_filter | condition
+
+    table = dataset.to_table(columns=columns, filter=month_filter)
+    print(f"📊 Loaded {table.num_rows} transactions ({table.num_columns} columns) from {root}")
+    return table.to_pandas()
+
+
+def to_export_columns(df):
+    """Rename archive columns to the export names the ML tools expect."""
+    df = df.rename(columns=EXPORT_COLUMN_NAMES)
+    for column in ['Opis', 'Nadawca', 'Produkt', 'Category']:
+        if column in df.columns:
+            df[column] = df[column].fillna('')
+    # The archive keeps sender and receiver in one column (as the bank export does)
+    if 'Odbiorca' not in df.columns:
+        df['Odbiorca'] = ''
+    return df
+
+
+def read_categorizer_data(root, months=None):
+    """Load only what categorization needs from the archive, in export column names."""
+    return to_export_columns(read_parquet_archive(root, columns=CATEGORIZER_COLUMNS, months=months))
+
+
+def compare_loaders(csv_file, repeat=5):
+    """Print load time and DataFrame memory of pd.read_csv vs read_export_csv."""
+    loaders = [
+        ('pd.read_csv', lambda: pd.read_csv(csv_file, sep=';', encoding='utf-8')),
+        ('read_export_csv (all columns)', lambda: read_export_csv(csv_file)),
+        ('read_export_csv (categorizer)', lambda: read_export_csv(csv_file, columns=CATEGORIZER_EXPORT_COLUMNS)),
+    ]
+    print(f"📊 {csv_file}, fast engine: {FAST_ENGINE}")
+    for name, loader in loaders:
+        best = None
+        for _ in range(repeat):
+            start = time.perf_counter()
+            df = loader()
+            elapsed = time.perf_counter() - start
+            best = elapsed if best is None else min(best, elapsed)
+        memory = df.memory_usage(deep=True).sum() / 1024 / 1024
+        print(f"  {name:32}: {best * 1000:8.1f} ms, {memory:7.2f} MiB, {len(df.columns)} columns")
+
+
+if __name__ == '__main__':
+    import sys
+    compare_loaders(sys.argv[1])